@@ -0,0 +1,144 @@
+"""
+OpenWeather API 상태 모니터
+
+프로세스마다 백그라운드 스레드 하나가 주기적으로 API 상태를 확인합니다.
+실제 날씨 조회의 응답 코드로도 상태를 갱신하므로, 최근 조회가 있었다면 별도 확인 요청은 생략합니다.
+단, 실제 조회는 키 상태가 확실한 응답(200/404 정상, 401 키 오류)일 때만 상태를 바꾸고,
+일시적인 실패(5xx, 시간 초과, 429)는 상태를 바꾸지 않습니다 (429는 회로로 처리).
+한 번의 실패로 모든 세션의 API 호출이 멈추지 않도록 하기 위함이며, 확인 요청이 실패했을 때는
+HEALTH_RETRY_INTERVAL 뒤에 바로 다시 확인합니다.
+화면 렌더링에서는 저장된 상태만 읽기 때문에 절대 기다리지 않습니다.
+"""
+import os
+import threading
+import time
+
+import requests
+
+from http_client import http_get
+
+HEALTH_CHECK_INTERVAL = int(os.getenv("API_HEALTH_CHECK_INTERVAL", "300"))
+# 확인 요청이 실패(error/network_error)했을 때 다시 확인하기까지의 시간 (초)
+HEALTH_RETRY_INTERVAL = int(os.getenv("API_HEALTH_RETRY_INTERVAL", "30"))
+HEALTH_CHECK_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# 401/429 응답 후 API 호출을 멈추는 시간 (초). 그동안의 조회는 네트워크 없이 같은 오류로 처리됩니다
+CIRCUIT_COOLDOWNS = {
+    401: int(os.getenv("API_CIRCUIT_AUTH_COOLDOWN", "300")),
+    429: int(os.getenv("API_CIRCUIT_RATE_LIMIT_COOLDOWN", "60")),
+}
+
+# 'unknown' | 'active' | 'invalid' | 'error' | 'network_error'
+# (error/network_error는 상태 확인 요청의 결과로만 설정됨)
+_health = {
+    "status": "unknown",
+    "updated_at": 0.0,
+}
+_lock = threading.Lock()
+# 열린 회로의 원인 상태 코드와 다시 시도할 수 있는 시각
+_circuit = {
+    "status_code": None,
+    "open_until": 0.0,
+}
+_monitor = {
+    "thread": None,
+    "api_key": None,
+}
+
+
+def status_from_code(status_code):
+    """HTTP 상태 코드를 API 상태 문자열로 변환합니다"""
+    # 404(도시 없음)도 API 키 자체는 정상이라는 뜻
+    if status_code in (200, 404):
+        return "active"
+    elif status_code == 401:
+        return "invalid"
+    else:
+        return "error"
+
+
+def set_api_status(status):
+    with _lock:
+        _health["status"] = status
+        _health["updated_at"] = time.time()
+
+
+def record_status_code(status_code, retry_after=None):
+    """
+    실제 API 응답 코드로 상태를 갱신합니다.
+    키 상태가 확실한 응답(200/404/401)만 상태에 반영하고, 일시적인 오류 코드는 상태를 바꾸지 않습니다.
+    401/429이면 회로를 열어 잠시 API 호출을 멈추고(429는 Retry-After가 있으면 그 시간만큼),
+    정상 응답(200/404)이면 회로를 닫습니다.
+    """
+    if status_code in (200, 404, 401):
+        set_api_status(status_from_code(status_code))
+
+    with _lock:
+        if status_code in CIRCUIT_COOLDOWNS:
+            cooldown = CIRCUIT_COOLDOWNS[status_code]
+            if status_code == 429 and retry_after:
+                cooldown = retry_after
+            _circuit["status_code"] = status_code
+            _circuit["open_until"] = time.time() + cooldown
+        elif status_code in (200, 404):
+            _circuit["status_code"] = None
+            _circuit["open_until"] = 0.0
+
+
+def get_open_circuit():
+    """회로가 열려 있으면 원인 상태 코드(401/429), 아니면 None을 반환합니다"""
+    with _lock:
+        if _circuit["status_code"] is not None and time.time() < _circuit["open_until"]:
+            return _circuit["status_code"]
+        return None
+
+
+def get_api_status():
+    """현재 API 상태를 반환합니다 (네트워크 호출 없음)"""
+    return _health["status"]
+
+
+def probe_api(api_key):
+    """테스트 요청(London)을 보내 API 상태를 확인합니다. 일시적인 오류도 상태에 반영합니다"""
+    params = {
+        "q": "London",
+        "appid": api_key,
+        "units": "metric",
+    }
+
+    try:
+        response = http_get(HEALTH_CHECK_URL, params=params)
+    except requests.exceptions.RequestException:
+        set_api_status("network_error")
+        return
+
+    record_status_code(response.status_code)
+    set_api_status(status_from_code(response.status_code))
+
+
+def _monitor_loop():
+    while True:
+        # 주기 안에 실제 조회로 상태가 확인되었다면 확인 요청 생략 (직전 확인이 실패했으면 항상 다시 확인)
+        failing = _health["status"] in ("error", "network_error")
+        if failing or time.time() - _health["updated_at"] >= HEALTH_CHECK_INTERVAL:
+            probe_api(_monitor["api_key"])
+
+        # 확인 요청이 실패했으면 짧은 간격으로 다시 확인
+        if _health["status"] in ("error", "network_error"):
+            time.sleep(HEALTH_RETRY_INTERVAL)
+        else:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+
+
+def start_health_monitor(api_key):
+    """상태 모니터 스레드를 시작합니다. 이미 실행 중이면 API 키만 갱신합니다"""
+    with _lock:
+        _monitor["api_key"] = api_key
+
+        thread = _monitor["thread"]
+        if thread is not None and thread.is_alive():
+            return
+
+        thread = threading.Thread(target=_monitor_loop, name="openweather-health", daemon=True)
+        _monitor["thread"] = thread
+        thread.start()
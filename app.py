@@ -4,13 +4,24 @@ import json
 import time
 import os
 import random
+import functools
 from datetime import datetime
 import plotly.express as px
-import plotly.graph_objects as go
-import folium
-from streamlit_folium import st_folium
 from dotenv import load_dotenv
 
+from api_health import get_api_status, start_health_monitor
+from city_index import get_city_index
+from city_search import get_city_name_index
+from coordinate_grid import quantize_coordinates
+from diary_analytics import get_diary_analytics
+from diary_store import format_diary_entry, get_diary_store, list_legacy_diaries
+from forecast_analysis import get_forecast_frame
+from forecast_chart import get_forecast_chart
+from http_client import http_get
+from weather_api import fetch_json, fetch_json_batch, get_recent_json, run_concurrently
+from weather_cache import FETCHED_AT_KEY, STALE_KEY
+from weather_map import get_korea_weather_map
+
 # 환경변수 로드
 load_dotenv()
 
@@ -248,10 +259,6 @@ def display_api_key_setup_guide():
     return False
 
 # 세션 상태 초기화
-if 'api_status' not in st.session_state:
-    st.session_state.api_status = 'unknown'
-if 'last_api_check' not in st.session_state:
-    st.session_state.last_api_check = 0
 if 'selected_city' not in st.session_state:
     st.session_state.selected_city = None
 if 'show_forecast' not in st.session_state:
@@ -355,231 +362,110 @@ KOREAN_CITY_MAPPING = {
 }
 
 def check_api_key_status():
-    """API 키 상태를 확인합니다."""
-    current_time = time.time()
-    
-    # 5분마다 API 상태 체크 (캐싱)
-    if current_time - st.session_state.last_api_check < 300:
-        return st.session_state.api_status
-    
-    try:
-        test_params = {
-            'q': 'London',
-            'appid': API_KEY,
-            'units': 'metric'
-        }
-        
-        response = requests.get(BASE_URL, params=test_params, timeout=10)
-        
-        if response.status_code == 200:
-            st.session_state.api_status = 'active'
-        elif response.status_code == 401:
-            st.session_state.api_status = 'invalid'
-        else:
-            st.session_state.api_status = 'error'
-            
-    except requests.exceptions.RequestException:
-        st.session_state.api_status = 'network_error'
-    
-    st.session_state.last_api_check = current_time
-    return st.session_state.api_status
+    """API 키 상태를 확인합니다 (프로세스 공용 상태 모니터의 값을 바로 반환)"""
+    start_health_monitor(API_KEY)
+    return get_api_status()
 
-def get_temperature_color(temp):
-    """온도에 따른 색상을 반환합니다"""
-    if temp < 0:
-        return '#0000FF'  # 파란색 (매우 추움)
-    elif temp < 10:
-        return '#4169E1'  # 로얄 블루 (추움)
-    elif temp < 20:
-        return '#32CD32'  # 라임 그린 (선선함)
-    elif temp < 25:
-        return '#FFD700'  # 골드 (적당함)
-    elif temp < 30:
-        return '#FF8C00'  # 다크 오렌지 (더움)
-    else:
-        return '#FF0000'  # 빨간색 (매우 더움)
+# 스크립트 실행(rerun) 1회 동안의 조회 결과 메모
+# app.py는 rerun마다 새로 실행되므로 이 딕셔너리도 실행마다 비어 있는 상태로 시작합니다
+_run_memo = {}
 
-def get_weather_icon_emoji(icon_code):
-    """OpenWeather 아이콘 코드를 텍스트로 변환"""
-    icon_map = {
-        '01d': 'SUN', '01n': 'MOON',  # 맑음
-        '02d': 'PARTLY_CLOUDY', '02n': 'CLOUDY',  # 구름조금
-        '03d': 'CLOUDY', '03n': 'CLOUDY',  # 구름많음
-        '04d': 'CLOUDY', '04n': 'CLOUDY',  # 흐림
-        '09d': 'RAIN', '09n': 'RAIN',  # 소나기
-        '10d': 'RAIN', '10n': 'RAIN',  # 비
-        '11d': 'STORM', '11n': 'STORM',  # 천둥번개
-        '13d': 'SNOW', '13n': 'SNOW',  # 눈
-        '50d': 'FOG', '50n': 'FOG'   # 안개
-    }
-    return icon_map.get(icon_code, 'CLEAR')
+def memoize_per_run(func):
+    """같은 실행 안에서 같은 인자로 다시 호출하면 이전 결과를 그대로 반환합니다 (도시명 변환, API 상태 확인, 요청, 안내 메시지 중복 방지)"""
+    @functools.wraps(func)
+    def wrapper(*args):
+        key = (func.__name__,) + args
+        if key not in _run_memo:
+            _run_memo[key] = func(*args)
+        return _run_memo[key]
+    return wrapper
 
-def create_korea_weather_map(center_city=None):
-    """한국 전국 날씨 지도를 생성합니다"""
-    # 중심 좌표 설정
-    if center_city and center_city in KOREAN_CITIES_COORDINATES:
-        center_coords = KOREAN_CITIES_COORDINATES[center_city]
-        center_lat, center_lon = center_coords["lat"], center_coords["lon"]
-        zoom_level = 10  # 도시 선택시 더 가까이
-    else:
-        center_lat, center_lon = 36.5, 127.5  # 한국 중심
-        zoom_level = 7
-    
-    # 지도 생성
-    korea_map = folium.Map(
-        location=[center_lat, center_lon],
-        zoom_start=zoom_level,
-        tiles='OpenStreetMap'
-    )
+def notify_live_data(data, success_message=None):
+    """실시간 데이터 조회 결과를 안내합니다. 갱신 주기가 지난 캐시 데이터라면 기준 시각을 함께 표시합니다"""
+    if data.get(STALE_KEY):
+        as_of = datetime.fromtimestamp(data.get(FETCHED_AT_KEY, time.time())).strftime('%H:%M')
+        st.info(f"🕒 {as_of} 기준 최근 데이터를 표시합니다. 최신 정보로 갱신하는 중이에요.")
+    elif success_message:
+        st.success(success_message)
+
+def get_korea_cities_weather():
+    """전국 주요 도시의 현재 날씨를 한 번에 조회합니다 (조회 실패한 도시는 데모 데이터 사용)"""
+    live_weather = {}
+    
+    if check_api_key_status() in ('active', 'unknown'):
+        params_by_city = {
+            city_name: {
+                'lat': coordinates["lat"],
+                'lon': coordinates["lon"],
+                'appid': API_KEY,
+                'units': 'metric',
+                'lang': 'kr'
+            }
+            for city_name, coordinates in KOREAN_CITIES_COORDINATES.items()
+        }
+        
+        # 모든 도시를 동시에 요청 (캐시된 도시는 바로 반환)
+        for city_name, (status_code, data) in fetch_json_batch(BASE_URL, params_by_city).items():
+            if status_code == 200:
+                live_weather[city_name] = data
     
-    # 각 도시의 날씨 정보를 지도에 추가
+    cities_weather = {}
     for city_name, coordinates in KOREAN_CITIES_COORDINATES.items():
-        try:
-            # 날씨 데이터 가져오기 (데모 데이터 사용)
-            weather_data = get_demo_weather_data(coordinates["eng"].lower())
-            
-            if weather_data:
-                temp = weather_data['main']['temp']
-                desc = weather_data['weather'][0].get('description', 
-                      weather_data['weather'][0].get('desc', ''))
-                icon = weather_data['weather'][0]['icon']
-                humidity = weather_data['main']['humidity']
-                
-                # 온도에 따른 색상
-                color = get_temperature_color(temp)
-                
-                # 날씨 아이콘 이모지
-                weather_emoji = get_weather_icon_emoji(icon)
-                
-                # 선택된 도시인지 확인
-                is_selected = (center_city == city_name)
-                marker_radius = 20 if is_selected else 15
-                marker_weight = 4 if is_selected else 2
-                
-                # 마커 생성
-                folium.CircleMarker(
-                    location=[coordinates["lat"], coordinates["lon"]],
-                    radius=marker_radius,
-                    popup=folium.Popup(f"""
-                    <div style="width: 200px; text-align: center;">
-                        <h4>{weather_emoji} {city_name}</h4>
-                        <p><strong>{temp}°C</strong></p>
-                        <p>{desc}</p>
-                        <p>습도: {humidity}%</p>
-                        {'<p><strong>선택된 도시</strong></p>' if is_selected else ''}
-                    </div>
-                    """, max_width=300),
-                    tooltip=f"{city_name}: {temp}°C",
-                    color='#FFD700' if is_selected else 'white',
-                    fillColor=color,
-                    fillOpacity=0.9 if is_selected else 0.8,
-                    weight=marker_weight
-                ).add_to(korea_map)
-                
-                # 온도 텍스트 오버레이
-                folium.Marker(
-                    location=[coordinates["lat"], coordinates["lon"]],
-                    icon=folium.DivIcon(
-                        html=f'<div style="color: white; font-weight: bold; font-size: 12px; text-shadow: 1px 1px 1px black;">{temp}°C</div>',
-                        icon_size=(50, 20),
-                        icon_anchor=(25, 10)
-                    )
-                ).add_to(korea_map)
-        
-        except Exception as e:
-            print(f"Error processing {city_name}: {e}")
-    
-    # 범례 추가
-    legend_html = '''
-    <div style="position: fixed; 
-                bottom: 50px; left: 50px; width: 200px; height: 120px; 
-                background-color: white; border:2px solid grey; z-index:9999; 
-                font-size:14px; padding: 10px">
-    <h4>온도 범례</h4>
-    <p><span style="color:#0000FF;">●</span> 0°C 미만 (매우 추움)</p>
-    <p><span style="color:#4169E1;">●</span> 0-10°C (추움)</p>
-    <p><span style="color:#32CD32;">●</span> 10-20°C (선선함)</p>
-    <p><span style="color:#FFD700;">●</span> 20-25°C (적당함)</p>
-    <p><span style="color:#FF8C00;">●</span> 25-30°C (더움)</p>
-    <p><span style="color:#FF0000;">●</span> 30°C 이상 (매우 더움)</p>
-    </div>
-    '''
-    korea_map.get_root().html.add_child(folium.Element(legend_html))
+        weather_data = live_weather.get(city_name) or get_demo_weather_data(coordinates["eng"].lower())
+        if weather_data:
+            cities_weather[city_name] = weather_data
     
-    return korea_map
+    return cities_weather
 
-def save_weather_diary(city, weather_data, diary_text, mood):
-    """날씨 일기를 저장합니다"""
-    import os
-    from datetime import datetime
-    
-    # 일기 저장 디렉토리 생성
-    diary_dir = "weather_diary"
-    if not os.path.exists(diary_dir):
-        os.makedirs(diary_dir)
-    
-    # 오늘 날짜로 파일명 생성
-    today = datetime.now().strftime("%Y-%m-%d")
-    filename = f"{diary_dir}/diary_{today}.txt"
+def create_korea_weather_map(center_city=None):
+    """한국 전국 날씨 지도를 반환합니다 (표시 내용이 같으면 렌더링한 지도 HTML을 재사용)"""
+    # 전국 도시 날씨를 한 번에 조회
+    cities_weather = get_korea_cities_weather()
     
+    return get_korea_weather_map(center_city, KOREAN_CITIES_COORDINATES, cities_weather)
+
+# 일기 보기 탭의 날짜 선택 목록 한 페이지에 표시할 날짜 수
+DIARY_DATES_PER_PAGE = 30
+# 일기 검색 결과 최대 표시 수
+DIARY_SEARCH_MAX_RESULTS = 50
+
+def save_weather_diary(city, weather_data, diary_text, mood):
+    """날씨 일기를 일기 저장소(SQLite)에 저장합니다"""
     # 날씨 정보 추출
     temp = weather_data['main']['temp']
     desc = weather_data['weather'][0].get('description', weather_data['weather'][0].get('desc', ''))
     humidity = weather_data['main']['humidity']
     
-    # 일기 내용 구성
-    diary_entry = f"""
-=== 날씨 일기 | {datetime.now().strftime("%Y년 %m월 %d일 %H:%M")} ===
-도시: {city}
-온도: {temp}°C
-날씨: {desc}
-습도: {humidity}%
-기분: {mood}
-
-오늘의 일기:
-{diary_text}
-
-{'='*50}
-
-"""
-    
-    # 파일에 추가 저장 (하루에 여러 번 쓸 수 있도록)
+    # 기록 단위로 저장 (하루에 여러 번 쓸 수 있도록)
     try:
-        with open(filename, 'a', encoding='utf-8') as f:
-            f.write(diary_entry)
-        return True, filename
+        store = get_diary_store()
+        store.add_entry(city, temp, desc, humidity, mood, diary_text)
+        return True, store.path
     except Exception as e:
         return False, str(e)
 
 def load_weather_diaries():
-    """저장된 날씨 일기들을 불러옵니다"""
-    import os
-    import glob
-    
-    diary_dir = "weather_diary"
-    if not os.path.exists(diary_dir):
-        return []
-    
-    # 모든 일기 파일 찾기
-    diary_files = glob.glob(f"{diary_dir}/diary_*.txt")
-    diaries = []
-    
-    for file_path in sorted(diary_files, reverse=True):  # 최신 순
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # 파일명에서 날짜 추출
-                filename = os.path.basename(file_path)
-                date = filename.replace('diary_', '').replace('.txt', '')
-                diaries.append({
-                    'date': date,
-                    'content': content,
-                    'file_path': file_path
-                })
-        except Exception as e:
-            continue
-    
-    return diaries
+    """
+    예전 버전이 텍스트 파일로 저장한 날씨 일기 목록을 불러옵니다.
+    파일 이름과 stat 정보만 읽으며, 내용은 각 항목의 read()로 필요할 때 읽습니다.
+    """
+    return list_legacy_diaries()
+
+def display_diary_content(diary_content):
+    """일기 내용을 스타일링된 박스로 표시"""
+    st.markdown(f"""
+    <div style="
+        background: rgba(25, 35, 126, 0.2);
+        border: 1px solid #42a5f5;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 10px 0;
+        white-space: pre-line;
+        font-family: 'Courier New', monospace;
+    ">
+    {diary_content}
+    </div>
+    """, unsafe_allow_html=True)
 
 def get_weather_mood_suggestions(weather_data):
     """날씨에 따른 기분 제안"""
@@ -880,9 +766,26 @@ def convert_korean_to_english_city(city_name):
         english_name = KOREAN_CITY_MAPPING[city_name]
         return english_name, True  # 변환됨
     
-    # 이미 영어이거나 매핑에 없는 경우 그대로 반환
+    # 매핑에 없으면 로컬 도시 목록에서 찾기 (행정 구역 접미사, 로마자 표기 등. 비슷한 다른 도시로 바꾸지는 않음)
+    city = get_city_name_index(KOREAN_CITY_MAPPING).resolve(city_name)
+    if city and city['name'] != city_name:
+        return city['name'], True  # 변환됨
+    
+    # 이미 영어이거나 찾지 못한 경우 그대로 반환
     return city_name, False  # 변환 안됨
 
+def get_city_query(english_city):
+    """
+    도시명을 API 조회 조건으로 바꿉니다.
+    로컬 도시 목록의 이름이나 한글 별칭과 정확히 같으면 도시 ID({'id': ...})로 조회해
+    서버의 이름 해석(동명 도시 등)을 거치지 않고, 그 밖의 이름은 입력 그대로({'q': ...}) 조회합니다.
+    (번들 목록은 일부 도시뿐이므로 목록에 없는 한글 도시명도 API에 맡기고, 없는 이름의 404는 부재 캐시에 맡김)
+    """
+    city = get_city_name_index(KOREAN_CITY_MAPPING).lookup(english_city)
+    if city:
+        return {'id': city['id']}
+    return {'q': english_city}
+
 def get_demo_weather_data(city_name):
     """
     API 키가 작동하지 않을 때 사용할 데모 데이터
@@ -1233,7 +1136,7 @@ def get_location_by_ip():
     """IP 주소를 기반으로 대략적인 위치를 가져옵니다"""
     try:
         # 무료 IP 지리 정보 서비스 사용
-        response = requests.get('http://ip-api.com/json/', timeout=5)
+        response = http_get('http://ip-api.com/json/')
         if response.status_code == 200:
             data = response.json()
             if data['status'] == 'success':
@@ -1247,29 +1150,48 @@ def get_location_by_ip():
         pass
     return None
 
+def get_coordinate_query(lat, lon):
+    """
+    좌표 조회에 사용할 (요청 파라미터, 맞춘 도시명)을 반환합니다.
+    반경 안에 주요 도시가 있으면 그 도시명으로 조회하고, 없으면 geohash 칸 중심 좌표로 조회합니다 (도시명은 None).
+    """
+    snapped_city = get_city_index(KOREAN_CITIES_COORDINATES).snap(lat, lon)
+    if snapped_city:
+        # 맞춘 도시 자신의 영문명으로 조회 (한글 별칭표는 근처 다른 도시를 가리킬 수 있음. 예: 김포 -> Incheon)
+        query = get_city_query(KOREAN_CITIES_COORDINATES[snapped_city]["eng"])
+    else:
+        # 같은 geohash 칸 안의 좌표는 칸 중심 좌표로 조회해 캐시를 함께 사용
+        grid_lat, grid_lon = quantize_coordinates(lat, lon)
+        query = {'lat': grid_lat, 'lon': grid_lon}
+    
+    params = {
+        **query,
+        'appid': API_KEY,
+        'units': 'metric',
+        'lang': 'kr'
+    }
+    return params, snapped_city
+
+@memoize_per_run
 def get_forecast_by_coordinates(lat, lon):
     """위도/경도 좌표를 사용하여 5일 예보 데이터를 가져옵니다"""
     
+    # 가까운 주요 도시가 있으면 도시명 조회와 같은 요청(같은 캐시 항목)으로 바꿔서 조회
+    params, snapped_city = get_coordinate_query(lat, lon)
+    demo_city = KOREAN_CITIES_COORDINATES[snapped_city]["eng"] if snapped_city else "seoul"
+    demo_label = f"가까운 도시({snapped_city})" if snapped_city else "기본 위치(서울)"
+    
     # API 상태 확인
     api_status = check_api_key_status()
     
-    # API가 활성화된 경우 실제 API 호출 시도
-    if api_status == 'active':
+    # API가 활성화되었거나 아직 확인 전이면 실제 API 호출 시도
+    if api_status in ('active', 'unknown'):
         try:
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': API_KEY,
-                'units': 'metric',
-                'lang': 'kr'
-            }
-            
             with st.spinner('🌐 5일 예보 데이터를 가져오는 중...'):
-                response = requests.get(FORECAST_URL, params=params, timeout=10)
+                status_code, data = fetch_json(FORECAST_URL, params)
             
-            if response.status_code == 200:
-                data = response.json()
-                st.success("✅ 5일 예보 데이터를 성공적으로 가져왔습니다!")
+            if status_code == 200:
+                notify_live_data(data, "✅ 5일 예보 데이터를 성공적으로 가져왔습니다!")
                 return data
             else:
                 st.warning("⚠️ 예보 API 오류 발생. 데모 모드로 전환합니다.")
@@ -1279,19 +1201,26 @@ def get_forecast_by_coordinates(lat, lon):
         except requests.exceptions.RequestException as e:
             st.warning(f"🌐 예보 네트워크 오류. 데모 모드로 전환합니다: {str(e)}")
     
-    # 데모 모드 - 서울 예보 데이터 반환
-    demo_data = get_demo_forecast_data("seoul")
+    # 최근에 받아 둔 실제 데이터가 있으면 데모 데이터보다 우선 사용
+    recent_data = get_recent_json(FORECAST_URL, params)
+    if recent_data:
+        notify_live_data(recent_data)
+        return recent_data
+    
+    # 데모 모드 - 가까운 도시(없으면 서울) 예보 데이터 반환
+    demo_data = get_demo_forecast_data(demo_city) or get_demo_forecast_data("seoul")
     if demo_data:
         if api_status == 'invalid':
-            st.warning("🔑 API 키가 유효하지 않습니다. 기본 위치(서울) 예보 데모 모드로 실행됩니다.")
+            st.warning(f"🔑 API 키가 유효하지 않습니다. {demo_label} 예보 데모 모드로 실행됩니다.")
         elif api_status == 'network_error':
-            st.warning("🌐 네트워크 연결 문제. 기본 위치(서울) 예보 데모 모드로 실행됩니다.")
+            st.warning(f"🌐 네트워크 연결 문제. {demo_label} 예보 데모 모드로 실행됩니다.")
         
-        st.info("✨ 기본 위치(서울) 예보 데모 데이터를 사용합니다.")
+        st.info(f"✨ {demo_label} 예보 데모 데이터를 사용합니다.")
         return demo_data
     
     return None
 
+@memoize_per_run
 def get_forecast_data(city_name):
     """도시명을 사용하여 5일 예보 데이터를 가져옵니다"""
     
@@ -1311,27 +1240,29 @@ def get_forecast_data(city_name):
     if was_converted:
         st.info(f"🔄 '{city_name}' → '{english_city}'로 변환하여 예보를 검색합니다.")
     
+    # 목록에 있는 도시는 도시 ID로, 그 밖에는 이름으로 조회
+    query = get_city_query(english_city)
+    
+    params = {
+        **query,
+        'appid': API_KEY,
+        'units': 'metric',
+        'lang': 'kr'
+    }
+    
     # API 상태 확인
     api_status = check_api_key_status()
     
-    # API가 활성화된 경우 실제 API 호출 시도
-    if api_status == 'active':
+    # API가 활성화되었거나 아직 확인 전이면 실제 API 호출 시도
+    if api_status in ('active', 'unknown'):
         try:
-            params = {
-                'q': english_city,
-                'appid': API_KEY,
-                'units': 'metric',
-                'lang': 'kr'
-            }
-            
             with st.spinner('🌐 5일 예보 데이터를 가져오는 중...'):
-                response = requests.get(FORECAST_URL, params=params, timeout=10)
+                status_code, data = fetch_json(FORECAST_URL, params)
             
-            if response.status_code == 200:
-                data = response.json()
-                st.success("✅ 5일 예보 데이터를 성공적으로 가져왔습니다!")
+            if status_code == 200:
+                notify_live_data(data, "✅ 5일 예보 데이터를 성공적으로 가져왔습니다!")
                 return data
-            elif response.status_code == 404:
+            elif status_code == 404:
                 st.error(f"'{city_name}' 도시의 예보를 찾을 수 없습니다.")
                 return None
             else:
@@ -1342,6 +1273,12 @@ def get_forecast_data(city_name):
         except requests.exceptions.RequestException as e:
             st.warning(f"🌐 예보 네트워크 오류. 데모 모드로 전환합니다: {str(e)}")
     
+    # 최근에 받아 둔 실제 데이터가 있으면 데모 데이터보다 우선 사용
+    recent_data = get_recent_json(FORECAST_URL, params)
+    if recent_data:
+        notify_live_data(recent_data)
+        return recent_data
+    
     # 데모 모드 실행
     demo_data = get_demo_forecast_data(english_city)
     if demo_data:
@@ -1358,51 +1295,98 @@ def get_forecast_data(city_name):
         st.info(f"**사용 가능한 예보 도시**: {available_cities}")
         return None
 
+def prefetch_city_weather(city_name):
+    """도시 선택 시 현재 날씨와 5일 예보를 동시에 요청해 공용 캐시를 미리 채웁니다"""
+    # 김포는 전용 데모 데이터를 사용하므로 미리 가져올 필요 없음
+    if city_name.strip() in ["김포", "김포시"]:
+        return
+    
+    if check_api_key_status() not in ('active', 'unknown'):
+        return
+    
+    english_city, _ = convert_korean_to_english_city(city_name)
+    query = get_city_query(english_city)
+    
+    params = {
+        **query,
+        'appid': API_KEY,
+        'units': 'metric',
+        'lang': 'kr'
+    }
+    
+    # 결과는 캐시에 저장되므로 이후 get_weather_data / get_forecast_data가 바로 사용
+    prefetch_weather_and_forecast(params)
+
+def prefetch_coordinate_weather(lat, lon):
+    """좌표의 현재 날씨와 5일 예보를 동시에 요청해 공용 캐시를 미리 채웁니다"""
+    if check_api_key_status() not in ('active', 'unknown'):
+        return
+    
+    # get_weather_by_coordinates / get_forecast_by_coordinates와 같은 요청(같은 캐시 항목)
+    params, _ = get_coordinate_query(lat, lon)
+    prefetch_weather_and_forecast(params)
+
+def prefetch_weather_and_forecast(params):
+    """
+    현재 날씨와 5일 예보 요청을 동시에 보냅니다.
+    캐시가 비었거나 만료된 경우에도 화면은 두 요청 시간의 합이 아니라 더 긴 쪽만 기다립니다.
+    실패는 여기서 무시하고, 이후 조회 함수가 캐시를 읽으면서 상태에 맞게 처리합니다.
+    """
+    with st.spinner('🌐 날씨와 예보 데이터를 가져오는 중...'):
+        run_concurrently({
+            'weather': (fetch_json, BASE_URL, params),
+            'forecast': (fetch_json, FORECAST_URL, params)
+        })
+
+@memoize_per_run
 def get_weather_by_coordinates(lat, lon):
     """위도/경도 좌표를 사용하여 날씨 데이터를 가져옵니다"""
     
+    # 가까운 주요 도시가 있으면 도시명 조회와 같은 요청(같은 캐시 항목)으로 바꿔서 조회
+    params, snapped_city = get_coordinate_query(lat, lon)
+    demo_city = KOREAN_CITIES_COORDINATES[snapped_city]["eng"] if snapped_city else "seoul"
+    demo_label = f"가까운 도시({snapped_city})" if snapped_city else "기본 위치(서울)"
+    
     # API 상태 확인
     api_status = check_api_key_status()
     
-    # API가 활성화된 경우 실제 API 호출 시도
-    if api_status == 'active':
+    # API가 활성화되었거나 아직 확인 전이면 실제 API 호출 시도
+    if api_status in ('active', 'unknown'):
         try:
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': API_KEY,
-                'units': 'metric',
-                'lang': 'kr'
-            }
-            
             with st.spinner('🌐 현재 위치의 실시간 날씨 데이터를 가져오는 중...'):
-                response = requests.get(BASE_URL, params=params, timeout=10)
+                status_code, data = fetch_json(BASE_URL, params)
             
-            if response.status_code == 200:
-                data = response.json()
-                st.success("✅ 현재 위치의 실시간 날씨 데이터를 성공적으로 가져왔습니다!")
+            if status_code == 200:
+                notify_live_data(data, "✅ 현재 위치의 실시간 날씨 데이터를 성공적으로 가져왔습니다!")
                 return data
             else:
-                st.warning("⚠️ API 오류 발생. 기본 위치(서울)로 데모 모드 실행합니다.")
+                st.warning(f"⚠️ API 오류 발생. {demo_label} 데모 모드로 실행합니다.")
                 
         except requests.exceptions.Timeout:
-            st.warning("⏱️ 요청 시간 초과. 기본 위치(서울)로 데모 모드 실행합니다.")
+            st.warning(f"⏱️ 요청 시간 초과. {demo_label} 데모 모드로 실행합니다.")
         except requests.exceptions.RequestException as e:
-            st.warning(f"🌐 네트워크 오류. 기본 위치(서울)로 데모 모드 실행합니다: {str(e)}")
+            st.warning(f"🌐 네트워크 오류. {demo_label} 데모 모드로 실행합니다: {str(e)}")
     
-    # 데모 모드 - 서울 데이터 반환
-    demo_data = get_demo_weather_data("seoul")
+    # 최근에 받아 둔 실제 데이터가 있으면 데모 데이터보다 우선 사용
+    recent_data = get_recent_json(BASE_URL, params)
+    if recent_data:
+        notify_live_data(recent_data)
+        return recent_data
+    
+    # 데모 모드 - 가까운 도시(없으면 서울) 데이터 반환
+    demo_data = get_demo_weather_data(demo_city) or get_demo_weather_data("seoul")
     if demo_data:
         if api_status == 'invalid':
-            st.warning("🔑 API 키가 유효하지 않습니다. 기본 위치(서울)로 데모 모드 실행됩니다.")
+            st.warning(f"🔑 API 키가 유효하지 않습니다. {demo_label} 데모 모드로 실행됩니다.")
         elif api_status == 'network_error':
-            st.warning("🌐 네트워크 연결 문제. 기본 위치(서울)로 데모 모드 실행됩니다.")
+            st.warning(f"🌐 네트워크 연결 문제. {demo_label} 데모 모드로 실행됩니다.")
         
-        st.info("✨ 기본 위치(서울) 데모 데이터를 사용하여 날씨 정보를 표시합니다.")
+        st.info(f"✨ {demo_label} 데모 데이터를 사용하여 날씨 정보를 표시합니다.")
         return demo_data
     
     return None
 
+@memoize_per_run
 def get_weather_data(city_name):
     """
     OpenWeather API를 사용하여 도시의 날씨 정보를 가져옵니다.
@@ -1422,18 +1406,21 @@ def get_weather_data(city_name):
         if was_converted:
             st.info(f"'{city_name}' → '{english_city}'로 변환하여 검색합니다.")
         
+        # 목록에 있는 도시는 도시 ID로, 그 밖에는 이름으로 조회
+        query = get_city_query(english_city)
+        
         # API 요청 URL 구성
         params = {
-            'q': english_city,
+            **query,
             'appid': API_KEY,
             'units': 'metric',  # 섭씨 온도 사용
             'lang': 'kr'  # 한국어 설명
         }
         
-        response = requests.get(BASE_URL, params=params)
+        status_code, data = fetch_json(BASE_URL, params)
         
         # HTTP 상태 코드별 세부 오류 처리
-        if response.status_code == 401:
+        if status_code == 401:
             st.warning("🔑 **API 키 오류**: API 키가 유효하지 않습니다.")
             st.info("📄 **데모 모드로 전환**: 샘플 데이터를 표시합니다.")
             st.info("• API 키가 올바른지 확인해주세요")
@@ -1451,18 +1438,21 @@ def get_weather_data(city_name):
                 st.error(f"😔 '{city_name}'에 대한 데모 데이터가 없습니다.")
                 st.info(f"**사용 가능한 데모 도시**: {available_cities}")
                 return None
-        elif response.status_code == 404:
+        elif status_code == 404:
             st.error(f"**도시 검색 오류**: '{city_name}' 도시를 찾을 수 없습니다.")
             st.error("• 도시명을 영어로 입력해주세요")
             st.error("• 철자를 확인해주세요")
             return None
-        elif response.status_code == 429:
+        elif status_code == 429:
             st.error("**API 한도 초과**: 잠시 후 다시 시도해주세요.")
             return None
         
-        response.raise_for_status()  # 기타 HTTP 에러 체크
+        # 기타 HTTP 에러 체크
+        if status_code != 200:
+            raise requests.exceptions.HTTPError(f"{status_code} Error for url: {BASE_URL}")
         
-        return response.json()
+        notify_live_data(data)
+        return data
     
     except requests.exceptions.RequestException as e:
         st.error(f"🌐 **네트워크 오류**: {e}")
@@ -1472,6 +1462,9 @@ def get_weather_data(city_name):
         st.error("📄 **응답 처리 오류**: API 응답을 처리하는 중 오류가 발생했습니다.")
         return None
 
+# 시간대별 상세 예보 제목 (forecast_analysis.PERIOD_NAMES 순서)
+FORECAST_PERIOD_LABELS = ["🌅 새벽 (00-06시)", "☀️ 오전 (06-12시)", "🌞 오후 (12-18시)", "🌙 저녁 (18-24시)"]
+
 def display_forecast_info(forecast_data):
     """5일 예보 정보를 화면에 표시합니다"""
     if not forecast_data:
@@ -1482,51 +1475,21 @@ def display_forecast_info(forecast_data):
     
     st.header(f"📅 {city_name}, {country} - 5일 예보")
     
-    # 🎯 차트 먼저 표시
+    # 🎯 차트 먼저 표시 (같은 조회 결과의 차트는 예보를 다시 파싱하지 않고 캐시에서 재사용)
     chart = create_forecast_chart(forecast_data)
     if chart:
         st.plotly_chart(chart, use_container_width=True)
     
-    # 일별로 데이터 그룹화
-    daily_forecasts = {}
-    
-    for item in forecast_data['list']:
-        date_str = datetime.fromtimestamp(item['dt']).strftime('%Y-%m-%d')
-        
-        if date_str not in daily_forecasts:
-            daily_forecasts[date_str] = []
-        
-        daily_forecasts[date_str].append(item)
-    
-    # 날짜별로 정렬
-    sorted_dates = sorted(daily_forecasts.keys())
+    # 예보를 한 번만 파싱해 차트와 일별/시간대별 집계에 함께 사용 (같은 조회 결과는 캐시에서 재사용)
+    forecast = get_forecast_frame(forecast_data)
     
-    # 5일치만 표시
-    for i, date_str in enumerate(sorted_dates[:5]):
-        day_data = daily_forecasts[date_str]
-        
-        # 해당 날짜의 최고/최저 온도 계산
-        temps = [item['main']['temp'] for item in day_data]
-        min_temp = min(temps)
-        max_temp = max(temps)
-        
-        # 가장 빈번한 날씨 상태 찾기
-        weather_counts = {}
-        for item in day_data:
-            # description 또는 desc 키를 처리
-            desc = item['weather'][0].get('description', item['weather'][0].get('desc', '알 수 없음'))
-            icon = item['weather'][0]['icon']
-            weather_counts[desc] = weather_counts.get(desc, 0) + 1
-        
-        most_common_weather = max(weather_counts, key=weather_counts.get)
-        
-        # 대표 아이콘 (가장 빈번한 날씨의 아이콘)
-        representative_icon = None
-        for item in day_data:
-            item_desc = item['weather'][0].get('description', item['weather'][0].get('desc', '알 수 없음'))
-            if item_desc == most_common_weather:
-                representative_icon = item['weather'][0]['icon']
-                break
+    # 5일치만 표시 (날짜순)
+    for day in forecast.day_cards()[:5]:
+        date_str = day['date']
+        min_temp = day['min_temp']
+        max_temp = day['max_temp']
+        most_common_weather = day['weather']
+        representative_icon = day['icon']
         
         # 날짜 표시
         date_obj = datetime.strptime(date_str, '%Y-%m-%d')
@@ -1548,9 +1511,7 @@ def display_forecast_info(forecast_data):
             with col3:
                 st.write(f"**{most_common_weather}**")
                 
-                # 평균 습도 계산
-                avg_humidity = sum(item['main']['humidity'] for item in day_data) // len(day_data)
-                st.write(f"💧 습도: {avg_humidity}%")
+                st.write(f"💧 습도: {day['avg_humidity']}%")
             
             with col4:
                 st.metric(
@@ -1560,110 +1521,31 @@ def display_forecast_info(forecast_data):
                 )
             
             with col5:
-                # 평균 풍속 계산
-                avg_wind = sum(item['wind']['speed'] for item in day_data) / len(day_data)
                 st.write(f"**🌪️ 풍속**")
-                st.write(f"{avg_wind:.1f} m/s")
+                st.write(f"{day['avg_wind']:.1f} m/s")
         
         # 시간대별 상세 정보 (펼치기/접기)
         with st.expander(f"🕐 {date_obj.strftime('%m/%d')} 시간대별 상세 예보"):
             
-            # 하루를 4개 시간대로 나누어 표시
-            time_periods = [
-                ("🌅 새벽 (00-06시)", [item for item in day_data if 0 <= datetime.fromtimestamp(item['dt']).hour < 6]),
-                ("☀️ 오전 (06-12시)", [item for item in day_data if 6 <= datetime.fromtimestamp(item['dt']).hour < 12]),
-                ("🌞 오후 (12-18시)", [item for item in day_data if 12 <= datetime.fromtimestamp(item['dt']).hour < 18]),
-                ("🌙 저녁 (18-24시)", [item for item in day_data if 18 <= datetime.fromtimestamp(item['dt']).hour < 24])
-            ]
-            
             cols = st.columns(4)
             
-            for j, (period_name, period_data) in enumerate(time_periods):
-                if period_data:  # 해당 시간대에 데이터가 있는 경우
-                    with cols[j]:
+            # 하루를 4개 시간대로 나누어 표시
+            for period, period_name in enumerate(FORECAST_PERIOD_LABELS):
+                if period in day['periods']:  # 해당 시간대에 데이터가 있는 경우
+                    avg_temp, period_weather = day['periods'][period]
+                    with cols[period]:
                         st.write(f"**{period_name}**")
-                        
-                        # 해당 시간대의 평균 온도
-                        avg_temp = sum(item['main']['temp'] for item in period_data) / len(period_data)
                         st.write(f"🌡️ {avg_temp:.1f}°C")
-                        
-                        # 가장 빈번한 날씨
-                        period_weather = {}
-                        for item in period_data:
-                            desc = item['weather'][0].get('description', item['weather'][0].get('desc', '알 수 없음'))
-                            period_weather[desc] = period_weather.get(desc, 0) + 1
-                        
-                        if period_weather:
-                            common_weather = max(period_weather, key=period_weather.get)
-                            st.write(f"☁️ {common_weather}")
+                        st.write(f"☁️ {period_weather}")
         
         st.markdown("---")
 
 def create_forecast_chart(forecast_data):
-    """5일 예보 데이터를 차트로 변환합니다"""
+    """5일 예보 데이터를 차트로 변환합니다 (3시간 간격 예보 전체 사용)"""
     if not forecast_data or 'list' not in forecast_data:
         return None
     
-    dates = []
-    temps = []
-    humidity = []
-    
-    # 일별 데이터 추출 (하루에 하나씩만)
-    seen_dates = set()
-    
-    for item in forecast_data['list']:
-        date_str = datetime.fromtimestamp(item['dt']).strftime('%m/%d')
-        
-        if date_str not in seen_dates:
-            dates.append(date_str)
-            temps.append(item['main']['temp'])
-            humidity.append(item['main']['humidity'])
-            seen_dates.add(date_str)
-            
-            if len(dates) >= 5:  # 5일치만
-                break
-    
-    # 온도 차트 생성
-    fig = go.Figure()
-    
-    # 온도 라인
-    fig.add_trace(go.Scatter(
-        x=dates, 
-        y=temps,
-        mode='lines+markers',
-        name='온도 (°C)',
-        line=dict(color='#FF6B6B', width=3),
-        marker=dict(size=8)
-    ))
-    
-    # 습도 라인 (보조축)
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=humidity,
-        mode='lines+markers',
-        name='습도 (%)',
-        line=dict(color='#4ECDC4', width=3),
-        marker=dict(size=8),
-        yaxis='y2'
-    ))
-    
-    # 레이아웃 설정
-    fig.update_layout(
-        title='📊 5일 날씨 트렌드',
-        xaxis_title='날짜',
-        yaxis_title='온도 (°C)',
-        yaxis2=dict(
-            title='습도 (%)',
-            overlaying='y',
-            side='right'
-        ),
-        hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=400
-    )
-    
-    return fig
+    return get_forecast_chart(forecast_data)
 
 def display_weather_info(weather_data):
     """
@@ -1780,6 +1662,9 @@ def main():
     """
     메인 애플리케이션 함수
     """
+    # 이번 실행의 조회 메모 초기화 (엔드포인트/위치별로 실행당 한 번만 조회)
+    _run_memo.clear()
+    
     # 페이지 설정
     st.set_page_config(
         page_title="날씨 정보 앱",
@@ -1820,6 +1705,7 @@ def main():
             with col:
                 if st.button(f"{city}", key=f"select_{city}", type="primary" if st.session_state.selected_city == city else "secondary", use_container_width=True):
                     st.session_state.selected_city = city
+                    prefetch_city_weather(city)
                     st.success(f"{city} 선택됨!")
                     st.rerun()
         
@@ -1832,6 +1718,7 @@ def main():
             with col:
                 if st.button(f"{city}", key=f"select_intl_{city}", type="primary" if st.session_state.selected_city == city else "secondary", use_container_width=True):
                     st.session_state.selected_city = city
+                    prefetch_city_weather(city)
                     st.success(f"{city} 선택됨!")
                     st.rerun()
     
@@ -1847,6 +1734,7 @@ def main():
         if map_city_select and map_city_select != "선택하세요":
             if st.button(f"{map_city_select} 선택", type="primary", key="confirm_map_select"):
                 st.session_state.selected_city = map_city_select
+                prefetch_city_weather(map_city_select)
                 st.success(f"{map_city_select} 선택됨!")
                 st.rerun()
     
@@ -1858,8 +1746,29 @@ def main():
             key="direct_city_input"
         )
         
+        # 자동완성 - 입력한 글자로 시작하는 도시 추천 (로컬 도시 목록 검색)
+        # 시작이 같은 도시가 없으면 철자가 비슷한 도시를 추천 (입력은 그대로 두고 사용자가 선택)
+        if city_input:
+            city_index = get_city_name_index(KOREAN_CITY_MAPPING)
+            suggestions = city_index.search(city_input)
+            suggestion_caption = "추천 도시:"
+            if not suggestions and not city_index.resolve(city_input):
+                suggestions = city_index.suggest(city_input)
+                suggestion_caption = "혹시 이 도시를 찾으셨나요?"
+            if suggestions:
+                st.caption(suggestion_caption)
+                suggestion_cols = st.columns(len(suggestions))
+                for col, (label, city) in zip(suggestion_cols, suggestions):
+                    with col:
+                        if st.button(f"{label} ({city['country']})", key=f"suggest_{city['id']}", use_container_width=True):
+                            st.session_state.selected_city = label
+                            prefetch_city_weather(label)
+                            st.success(f"{label} 선택됨!")
+                            st.rerun()
+        
         if st.button("도시 선택", type="primary", key="confirm_direct_input") and city_input:
             st.session_state.selected_city = city_input
+            prefetch_city_weather(city_input)
             st.success(f"{city_input} 선택됨!")
             st.rerun()
     
@@ -1892,6 +1801,8 @@ def main():
         st.markdown("---")
         st.subheader(f"{st.session_state.selected_city} CURRENT WEATHER")
         
+        # 아래에서 읽을 현재 날씨와 예보를 한 번에 동시 요청
+        prefetch_city_weather(st.session_state.selected_city)
         weather_data = get_weather_data(st.session_state.selected_city)
         if weather_data:
             # 메인 날씨 정보를 2개 열로 구성
@@ -2099,13 +2010,12 @@ def main():
         
         with col_map:
             with st.spinner("전국 날씨 지도를 생성하는 중..."):
-                weather_map = create_korea_weather_map()
                 # 선택된 도시가 있으면 해당 위치로 중심 이동
-                if map_city_search and map_city_search != "선택하세요":
-                    city_coords = KOREAN_CITIES_COORDINATES[map_city_search]
-                    weather_map = create_korea_weather_map(center_city=map_city_search)
+                center_city = map_city_search if map_city_search != "선택하세요" else None
+                weather_map = create_korea_weather_map(center_city=center_city)
                 
-                map_data = st_folium(weather_map, width=500, height=400, key="weather_map")
+                # 데이터가 바뀔 때만 렌더링한 HTML을 그대로 표시 (rerun마다 다시 렌더링하지 않음)
+                st.iframe(weather_map.html, width=500, height=400, alt="전국 날씨 지도")
         
         with col_weather:
             # 선택된 도시의 날씨 상세 정보
@@ -2142,6 +2052,7 @@ def main():
                     if st.button(f"{map_city_search} 5일 예보", type="primary", key="map_forecast_btn"):
                         st.session_state.selected_city = map_city_search
                         st.session_state.show_forecast[map_city_search] = True
+                        prefetch_city_weather(map_city_search)
             else:
                 st.info("왼쪽 드롭다운에서 도시를 선택하거나 지도의 마커를 클릭해보세요!")
         
@@ -2254,7 +2165,7 @@ def main():
     st.info("오늘 날씨와 함께 일기를 써보세요! 날씨와 기분이 함께 기록됩니다.")
     
     # 일기 쓰기와 보기 탭
-    diary_tab1, diary_tab2 = st.tabs(["일기 쓰기", "일기 보기"])
+    diary_tab1, diary_tab2, diary_tab3 = st.tabs(["일기 쓰기", "일기 보기", "일기 분석"])
     
     with diary_tab1:
         if st.session_state.selected_city:
@@ -2373,41 +2284,86 @@ def main():
             st.markdown("- **직접 입력**: 도시명 직접 입력")
     
     with diary_tab2:
-        # 저장된 일기들 보기
-        diaries = load_weather_diaries()
+        # 저장된 일기들 보기 (저장소는 날짜 목록만 조회, 예전 텍스트 파일 일기도 함께 표시)
+        diary_store = get_diary_store()
+        legacy_diaries = {diary.date: diary for diary in load_weather_diaries()}
+        diary_dates = sorted(set(diary_store.list_dates()) | set(legacy_diaries), reverse=True)
         
-        if diaries:
-            st.write(f"**총 {len(diaries)}개의 일기가 있습니다**")
+        if diary_dates:
+            # 본문/도시/기분 검색 (전문 검색 색인 사용, 파일을 다시 읽지 않음)
+            search_query = st.text_input("🔍 일기 검색 (본문, 도시, 기분):", key="diary_search")
+            if search_query.strip():
+                search_results = diary_store.search(search_query, limit=DIARY_SEARCH_MAX_RESULTS)
+                if search_results:
+                    st.write(f"**검색 결과 {len(search_results)}개** (최신 순, 최대 {DIARY_SEARCH_MAX_RESULTS}개)")
+                    display_diary_content("".join(format_diary_entry(entry) for entry in search_results))
+                else:
+                    st.info("검색 결과가 없습니다.")
+                st.markdown("---")
+            
+            st.write(f"**총 {len(diary_dates)}개의 일기가 있습니다**")
+            
+            # 날짜가 많으면 페이지로 나누어 선택
+            page_count = (len(diary_dates) - 1) // DIARY_DATES_PER_PAGE + 1
+            page = 1
+            if page_count > 1:
+                page = st.number_input(f"페이지 (1-{page_count}):", min_value=1, max_value=page_count, value=1, step=1, key="diary_page")
+            page_dates = diary_dates[(page - 1) * DIARY_DATES_PER_PAGE:page * DIARY_DATES_PER_PAGE]
             
             # 날짜별 일기 선택
-            diary_dates = [diary['date'] for diary in diaries]
-            selected_date = st.selectbox("날짜 선택:", diary_dates)
+            selected_date = st.selectbox("날짜 선택:", page_dates)
+            
+            # 선택된 날짜의 일기만 불러오기
+            diary_content = ""
+            if selected_date in legacy_diaries:
+                diary_content += legacy_diaries[selected_date].read()
+            diary_content += "".join(format_diary_entry(entry) for entry in diary_store.get_entries(selected_date))
             
-            # 선택된 날짜의 일기 표시
-            selected_diary = next((d for d in diaries if d['date'] == selected_date), None)
-            if selected_diary:
+            if diary_content:
                 st.markdown("### 📖 일기 내용")
                 
                 # 날씨 일기 내용을 예쁘게 표시
-                diary_content = selected_diary['content']
-                
-                # 스타일링된 박스로 표시
-                st.markdown(f"""
-                <div style="
-                    background: rgba(25, 35, 126, 0.2);
-                    border: 1px solid #42a5f5;
-                    border-radius: 10px;
-                    padding: 20px;
-                    margin: 10px 0;
-                    white-space: pre-line;
-                    font-family: 'Courier New', monospace;
-                ">
-                {diary_content}
-                </div>
-                """, unsafe_allow_html=True)
+                display_diary_content(diary_content)
         else:
             st.info("아직 작성된 일기가 없습니다. 첫 번째 날씨 일기를 써보세요!")
     
+    with diary_tab3:
+        # 지난 방문 이후 새로 저장된 일기만 읽어서 분석 결과 갱신
+        analytics = get_diary_analytics(get_diary_store())
+        analytics.refresh(load_weather_diaries())
+        results = analytics.results()
+        
+        if results['entries']:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("총 일기 수", f"{results['entries']}편")
+            with col2:
+                st.metric("현재 연속 기록", f"{results['current_streak']}일")
+            with col3:
+                st.metric("최장 연속 기록", f"{results['longest_streak']}일")
+            
+            if not results['mood_by_weather'].empty:
+                st.write("**🌤️ 날씨별 기분**")
+                st.dataframe(results['mood_by_weather'], use_container_width=True)
+            
+            if not results['mood_by_temperature'].empty:
+                st.write("**🌡️ 온도대별 기분**")
+                st.dataframe(results['mood_by_temperature'], use_container_width=True)
+            
+            st.write("**📅 월별 요약**")
+            st.dataframe(
+                results['monthly'].rename(columns={
+                    'entries': '일기 수',
+                    'days': '기록한 날',
+                    'top_mood': '가장 많은 기분',
+                    'avg_temp': '평균 온도(°C)',
+                    'top_weather': '가장 많은 날씨',
+                }).round(1),
+                use_container_width=True,
+            )
+        else:
+            st.info("아직 분석할 일기가 없습니다. 일기를 써보세요!")
+    
     st.markdown("---")
     
     # 현재 위치 기반 날씨 섹션
@@ -2437,6 +2393,8 @@ def main():
         
         st.success(f"감지된 위치: {location_info['city']}, {location_info['country']}")
         
+        # 현재 날씨와 (예보 버튼에서 읽을) 예보를 한 번에 동시 요청
+        prefetch_coordinate_weather(location_info['lat'], location_info['lon'])
         weather_data = get_weather_by_coordinates(
             location_info['lat'], 
             location_info['lon']
@@ -2500,6 +2458,7 @@ def main():
         # 좌표 기반 날씨 결과를 전체 넓이로 표시
         if st.session_state.get('coordinate_weather_data', {}).get('show_weather', False):
             coord_data = st.session_state.coordinate_weather_data
+            prefetch_coordinate_weather(coord_data['lat'], coord_data['lon'])
             weather_data = get_weather_by_coordinates(coord_data['lat'], coord_data['lon'])
             if weather_data:
                 st.markdown("---")
@@ -6,6 +6,10 @@ import time
 import os
 from dotenv import load_dotenv
 
+from api_health import get_api_status, start_health_monitor
+from weather_api import fetch_json, get_recent_json
+from weather_cache import FETCHED_AT_KEY, STALE_KEY
+
 # 환경변수 로드
 load_dotenv()
 
@@ -86,12 +90,6 @@ def display_api_key_setup_guide():
     
     return False
 
-# 세션 상태 초기화
-if 'api_status' not in st.session_state:
-    st.session_state.api_status = 'unknown'
-if 'last_api_check' not in st.session_state:
-    st.session_state.last_api_check = 0
-
 # 한글 도시명 매핑
 KOREAN_CITY_MAPPING = {
     # 광역시/특별시
@@ -129,34 +127,17 @@ KOREAN_CITY_MAPPING = {
 }
 
 def check_api_key_status():
-    """API 키 상태를 확인합니다."""
-    current_time = time.time()
-    
-    # 5분마다 API 상태 체크 (캐싱)
-    if current_time - st.session_state.last_api_check < 300:
-        return st.session_state.api_status
-    
-    try:
-        test_params = {
-            'q': 'London',
-            'appid': API_KEY,
-            'units': 'metric'
-        }
-        
-        response = requests.get(BASE_URL, params=test_params, timeout=10)
-        
-        if response.status_code == 200:
-            st.session_state.api_status = 'active'
-        elif response.status_code == 401:
-            st.session_state.api_status = 'invalid'
-        else:
-            st.session_state.api_status = 'error'
-            
-    except requests.exceptions.RequestException:
-        st.session_state.api_status = 'network_error'
-    
-    st.session_state.last_api_check = current_time
-    return st.session_state.api_status
+    """API 키 상태를 확인합니다 (프로세스 공용 상태 모니터의 값을 바로 반환)"""
+    start_health_monitor(API_KEY)
+    return get_api_status()
+
+def notify_live_data(data, success_message=None):
+    """실시간 데이터 조회 결과를 안내합니다. 갱신 주기가 지난 캐시 데이터라면 기준 시각을 함께 표시합니다"""
+    if data.get(STALE_KEY):
+        as_of = datetime.fromtimestamp(data.get(FETCHED_AT_KEY, time.time())).strftime('%H:%M')
+        st.info(f"🕒 {as_of} 기준 최근 데이터를 표시합니다. 최신 정보로 갱신하는 중이에요.")
+    elif success_message:
+        st.success(success_message)
 
 def convert_korean_to_english_city(city_name):
     """한글 도시명을 영어로 변환"""
@@ -263,27 +244,26 @@ def get_weather_data(city_name):
     if was_converted:
         st.info(f"🔄 '{city_name}' → '{english_city}'로 변환하여 검색합니다.")
     
+    params = {
+        'q': english_city,
+        'appid': API_KEY,
+        'units': 'metric',
+        'lang': 'kr'
+    }
+    
     # API 상태 확인
     api_status = check_api_key_status()
     
-    # API가 활성화된 경우 실제 API 호출 시도
-    if api_status == 'active':
+    # API가 활성화되었거나 아직 확인 전이면 실제 API 호출 시도
+    if api_status in ('active', 'unknown'):
         try:
-            params = {
-                'q': english_city,
-                'appid': API_KEY,
-                'units': 'metric',
-                'lang': 'kr'
-            }
-            
             with st.spinner('🌐 실시간 날씨 데이터를 가져오는 중...'):
-                response = requests.get(BASE_URL, params=params, timeout=10)
+                status_code, data = fetch_json(BASE_URL, params)
             
-            if response.status_code == 200:
-                data = response.json()
-                st.success("✅ 실시간 날씨 데이터를 성공적으로 가져왔습니다!")
+            if status_code == 200:
+                notify_live_data(data, "✅ 실시간 날씨 데이터를 성공적으로 가져왔습니다!")
                 return data
-            elif response.status_code == 404:
+            elif status_code == 404:
                 st.error(f"🏙️ '{city_name}' 도시를 찾을 수 없습니다.")
                 return None
             else:
@@ -294,6 +274,12 @@ def get_weather_data(city_name):
         except requests.exceptions.RequestException as e:
             st.warning(f"🌐 네트워크 오류. 데모 모드로 전환합니다: {str(e)}")
     
+    # 최근에 받아 둔 실제 데이터가 있으면 데모 데이터보다 우선 사용
+    recent_data = get_recent_json(BASE_URL, params)
+    if recent_data:
+        notify_live_data(recent_data)
+        return recent_data
+    
     # 데모 모드 실행
     demo_data = get_demo_weather_data(english_city)
     if demo_data:
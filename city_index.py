@@ -0,0 +1,138 @@
+"""
+도시 좌표 공간 인덱스
+
+위도/경도를 단위 구 위의 3차원 좌표로 바꿔 k-d 트리에 넣어 두고,
+임의의 좌표에서 가장 가까운 도시를 O(log n)에 찾습니다.
+(구 위의 직선 거리는 대원 거리와 순서가 같으므로 가까운 순서가 그대로 유지됩니다)
+
+좌표 조회를 반경 안의 알려진 도시로 맞추면(snap) 도시명 조회와 같은 캐시 항목과
+그 도시의 데모 데이터를 사용할 수 있습니다.
+"""
+import math
+import os
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+
+# 이 거리(km) 안에 알려진 도시가 있으면 좌표를 그 도시로 맞춤
+CITY_SNAP_RADIUS_KM = float(os.getenv("CITY_SNAP_RADIUS_KM", "10"))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 좌표 사이의 대원 거리 (km)"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _to_unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def _build_tree(points, depth=0):
+    """points: [(단위 벡터, 도시명)] -> (벡터, 도시명, 축, 왼쪽, 오른쪽) 노드"""
+    if not points:
+        return None
+
+    axis = depth % 3
+    points.sort(key=lambda point: point[0][axis])
+    median = len(points) // 2
+    vector, name = points[median]
+    return (
+        vector,
+        name,
+        axis,
+        _build_tree(points[:median], depth + 1),
+        _build_tree(points[median + 1:], depth + 1),
+    )
+
+
+class CitySpatialIndex:
+    """{도시명: {"lat": ..., "lon": ...}} 목록에 대한 최근접 도시 검색"""
+
+    def __init__(self, cities=None):
+        self._cities = {}
+        self._root = None
+        self._lock = threading.Lock()
+        if cities:
+            self.add_cities(cities)
+
+    def __len__(self):
+        return len(self._cities)
+
+    def add_cities(self, cities):
+        """도시를 추가하고 트리를 다시 만듭니다 (같은 이름은 좌표를 덮어씀)"""
+        with self._lock:
+            for name, coordinates in cities.items():
+                self._cities[name] = (coordinates["lat"], coordinates["lon"])
+
+            points = [
+                (_to_unit_vector(lat, lon), name)
+                for name, (lat, lon) in self._cities.items()
+            ]
+            self._root = _build_tree(points)
+
+    def nearest(self, lat, lon):
+        """가장 가까운 도시의 (도시명, 거리 km)를 반환합니다. 도시가 없으면 (None, inf)"""
+        root = self._root
+        if root is None:
+            return None, math.inf
+
+        target = _to_unit_vector(lat, lon)
+        best = [None, math.inf]  # [도시명, 직선 거리의 제곱]
+
+        def search(node):
+            if node is None:
+                return
+
+            vector, name, axis, left, right = node
+            distance = sum((a - b) ** 2 for a, b in zip(vector, target))
+            if distance < best[1]:
+                best[0], best[1] = name, distance
+
+            diff = target[axis] - vector[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            # 분할 평면까지의 거리가 현재 최단 거리보다 짧을 때만 반대쪽도 확인
+            if diff ** 2 < best[1]:
+                search(far)
+
+        search(root)
+
+        city_lat, city_lon = self._cities[best[0]]
+        return best[0], haversine_km(lat, lon, city_lat, city_lon)
+
+    def snap(self, lat, lon, radius_km=CITY_SNAP_RADIUS_KM):
+        """반경 안에 있는 가장 가까운 도시명을 반환합니다 (없으면 None)"""
+        name, distance = self.nearest(lat, lon)
+        if distance <= radius_km:
+            return name
+        return None
+
+
+# 도시 목록별 인덱스 (Streamlit rerun마다 트리를 다시 만들지 않도록 프로세스에 보관)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_city_index(cities):
+    """같은 도시 목록에 대해서는 이미 만들어 둔 인덱스를 반환합니다"""
+    key = tuple(sorted(
+        (name, coordinates["lat"], coordinates["lon"])
+        for name, coordinates in cities.items()
+    ))
+
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = CitySpatialIndex(cities)
+            _indexes[key] = index
+    return index
@@ -0,0 +1,338 @@
+"""
+로컬 도시 이름 검색
+
+data/city.list.json(OpenWeather city.list.json 형식)을 읽어 도시 이름 인덱스를 만듭니다.
+네트워크 호출 없이 다음 방식으로 입력을 도시로 맞춥니다.
+
+- 접두어 검색: 정렬된 키 목록에서 이진 탐색 (자동완성)
+- 한글 자모 분해: '서우'처럼 입력 중인 글자도 '서울'의 접두어로 인식
+- 로마자 표기: 목록에 없는 한글 도시명은 로마자로 바꿔 영문 이름과 비교 ('포항' -> 'pohang')
+- 편집 거리: 'seould', 'Seul' 같은 오타에 가장 가까운 이름을 추천
+
+도시 목록은 전 세계 도시의 일부일 뿐이므로 목록에 없는 이름을 비슷한 다른 도시로 바꾸지 않습니다.
+편집 거리로 찾은 도시는 추천(suggest)으로만 보여 주고, 자동으로 고치는 것은
+'서욿ㄹ'처럼 낱자모가 섞여 실제 도시명일 수 없는 한글 입력뿐입니다.
+편집 거리 후보는 바이그램 색인과 길이 조건으로 먼저 좁힌 뒤에만 거리를 계산합니다.
+"""
+import bisect
+import json
+import os
+import threading
+
+CITY_LIST_PATH = os.getenv(
+    "CITY_LIST_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "city.list.json"),
+)
+
+# 입력별 검색 결과를 기억하는 최대 개수
+RESOLVED_CACHE_MAX_ENTRIES = 1024
+
+# 한글 도시명 끝에 붙는 행정 구역 접미사 (긴 것부터 확인)
+HANGUL_CITY_SUFFIXES = ("특별자치시", "특별자치도", "특별시", "광역시", "시", "군")
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+# 호환용 한글 자모 (음절을 이루지 않은 낱자모 'ㄱ', 'ㅏ' 등)
+HANGUL_JAMO_FIRST = 0x3131
+HANGUL_JAMO_LAST = 0x318E
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+# 국어의 로마자 표기법 (음운 변화는 반영하지 않은 글자 단위 변환)
+CHOSEONG_ROMAN = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+JUNGSEONG_ROMAN = [
+    "a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae",
+    "oe", "yo", "u", "wo", "we", "wi", "yu", "eu", "ui", "i",
+]
+JONGSEONG_ROMAN = [
+    "", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p",
+    "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t",
+]
+
+
+def is_hangul(text):
+    return any(HANGUL_BASE <= ord(char) <= HANGUL_LAST for char in text)
+
+
+def has_loose_jamo(text):
+    """음절을 이루지 않은 낱자모가 있는지 (입력 중이거나 오타인 한글)"""
+    return any(HANGUL_JAMO_FIRST <= ord(char) <= HANGUL_JAMO_LAST for char in text)
+
+
+def _split_syllable(char):
+    code = ord(char) - HANGUL_BASE
+    return code // (21 * 28), (code // 28) % 21, code % 28
+
+
+def decompose_hangul(text):
+    """한글 음절을 자모로 분해합니다 ('서울' -> 'ㅅㅓㅇㅜㄹ'). 한글이 아닌 글자는 그대로 둡니다"""
+    jamo = []
+    for char in text:
+        if HANGUL_BASE <= ord(char) <= HANGUL_LAST:
+            initial, medial, final = _split_syllable(char)
+            jamo.append(CHOSEONG[initial])
+            jamo.append(JUNGSEONG[medial])
+            if final:
+                jamo.append(JONGSEONG[final])
+        else:
+            jamo.append(char)
+    return "".join(jamo)
+
+
+def romanize_hangul(text):
+    """한글을 로마자로 바꿉니다 ('부산' -> 'busan')"""
+    roman = []
+    for char in text:
+        if HANGUL_BASE <= ord(char) <= HANGUL_LAST:
+            initial, medial, final = _split_syllable(char)
+            roman.append(CHOSEONG_ROMAN[initial] + JUNGSEONG_ROMAN[medial] + JONGSEONG_ROMAN[final])
+        else:
+            roman.append(char)
+    return "".join(roman)
+
+
+def normalize_name(name):
+    """비교용 이름: 소문자, 공백/하이픈/아포스트로피 제거. 한글은 자모로 분해"""
+    name = name.strip().lower()
+    for char in " -'’.":
+        name = name.replace(char, "")
+    return decompose_hangul(name)
+
+
+def _bigrams(key):
+    padded = f"^{key}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def edit_distance(a, b, max_distance):
+    """
+    레벤슈타인 거리를 계산합니다.
+    max_distance를 넘는 것이 확실해지면 바로 max_distance + 1을 반환합니다.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def load_city_list(path=CITY_LIST_PATH):
+    """OpenWeather city.list.json 형식의 도시 목록을 읽습니다 (파일이 없으면 빈 목록)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading city list {path}: {e}")
+        return []
+
+
+class CityNameIndex:
+    """도시 목록과 한글 별칭({한글명: 영문명})에 대한 이름 검색"""
+
+    def __init__(self, cities, aliases=None):
+        self.cities = cities
+        # (비교용 키, 표시 이름, 도시) - 키 순으로 정렬해 접두어 검색에 사용
+        entries = []
+        self._exact = {}
+
+        for city in cities:
+            self._add_entry(entries, normalize_name(city["name"]), city["name"], city)
+        self._set_entries(entries)
+
+        alias_entries = []
+        for alias, english_name in (aliases or {}).items():
+            city = self._find_by_name(english_name)
+            if city is not None:
+                self._add_entry(alias_entries, normalize_name(alias), alias, city)
+        if alias_entries:
+            self._set_entries(entries + alias_entries)
+
+        # (바이그램, 키 길이) -> 항목 위치 (편집 거리 후보 검색용, 길이가 비슷한 키만 확인)
+        self._bigram_postings = {}
+        for position, (key, _, _) in enumerate(self._entries):
+            for gram in _bigrams(key):
+                self._bigram_postings.setdefault((gram, len(key)), []).append(position)
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def _set_entries(self, entries):
+        entries.sort(key=lambda entry: entry[0])
+        self._entries = entries
+        self._keys = [entry[0] for entry in entries]
+
+    def _add_entry(self, entries, key, label, city):
+        if not key:
+            return
+        entries.append((key, label, city))
+        # 같은 이름이 여러 개면 먼저 나온(목록 앞쪽) 도시를 사용
+        self._exact.setdefault(key, city)
+
+    def _find_by_name(self, name):
+        """영문명으로 도시를 찾습니다. 정확히 같은 이름이 없으면 유일한 접두어 일치를 사용 ('Jeju' -> 'Jeju City')"""
+        city = self._exact.get(normalize_name(name))
+        if city is not None:
+            return city
+        matches = self.search(name, limit=2)
+        if len(matches) != 1:
+            return None
+        return matches[0][1]
+
+    def search(self, query, limit=5):
+        """
+        자동완성용 접두어 검색. [(표시 이름, 도시)]를 반환하며 같은 도시는 한 번만 포함합니다.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        results = []
+        seen = set()
+        for position in range(bisect.bisect_left(self._keys, key), len(self._keys)):
+            entry_key, label, city = self._entries[position]
+            if not entry_key.startswith(key):
+                break
+            if city["id"] in seen:
+                continue
+            seen.add(city["id"])
+            results.append((label, city))
+            if len(results) >= limit:
+                break
+        return results
+
+    def resolve(self, query):
+        """
+        입력을 도시 하나로 맞춥니다 (같은 이름, 한글 별칭, 접미사 제거, 로마자 표기).
+        찾지 못하면 None이며, 비슷한 이름은 suggest()로 추천합니다. 결과는 입력별로 기억합니다.
+        """
+        query = query.strip()
+        if query in self._resolved:
+            return self._resolved[query]
+
+        city = self._resolve(query)
+        with self._lock:
+            if len(self._resolved) >= RESOLVED_CACHE_MAX_ENTRIES:
+                self._resolved.clear()
+            self._resolved[query] = city
+        return city
+
+    def lookup(self, name):
+        """정규화한 이름이 도시명이나 한글 별칭과 정확히 같은 도시 (없으면 None)"""
+        return self._exact.get(normalize_name(name))
+
+    def suggest(self, query, limit=3):
+        """
+        오타로 보이는 입력에 대한 추천 [(표시 이름, 도시)] (편집 거리가 짧은 순).
+        결과는 사용자가 고르도록 보여 주는 용도이며 입력을 자동으로 바꾸지 않습니다.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        results = []
+        seen = set()
+        for _, label, city in self._near_matches(key):
+            if city["id"] in seen:
+                continue
+            seen.add(city["id"])
+            results.append((label, city))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _near_matches(self, key, max_distance=None):
+        """편집 거리 max_distance 이내의 항목 [(거리, 표시 이름, 도시)] (거리 순)"""
+        if max_distance is None:
+            max_distance = max(1, len(key) // 4)
+
+        # 편집 한 번은 바이그램을 최대 2개 바꾸므로, 거리 안의 이름은 이만큼의 바이그램을 공유함
+        grams = _bigrams(key)
+        min_shared = len(grams) - 2 * max_distance
+        lengths = range(max(1, len(key) - max_distance), len(key) + max_distance + 1)
+
+        if min_shared > 0:
+            shared = {}
+            for gram in grams:
+                for length in lengths:
+                    for position in self._bigram_postings.get((gram, length), ()):
+                        shared[position] = shared.get(position, 0) + 1
+            candidates = [position for position, count in shared.items() if count >= min_shared]
+        else:
+            # 아주 짧은 입력은 공유 바이그램 조건으로 거를 수 없어 길이만 맞는 키를 모두 확인
+            candidates = [
+                position for position, entry in enumerate(self._entries) if len(entry[0]) in lengths
+            ]
+
+        matches = []
+        for position in candidates:
+            entry_key, label, city = self._entries[position]
+            distance = edit_distance(key, entry_key, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, label, city))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def _resolve(self, query):
+        key = normalize_name(query)
+        if not key:
+            return None
+
+        candidates = [key]
+        if is_hangul(query):
+            # 행정 구역 접미사 제거 ('포항시' -> '포항')
+            stem = query
+            for suffix in HANGUL_CITY_SUFFIXES:
+                if query.endswith(suffix) and len(query) > len(suffix):
+                    stem = query[:-len(suffix)]
+                    candidates.append(normalize_name(stem))
+                    break
+            # 로마자 표기로 영문 이름과 비교 ('포항' -> 'pohang')
+            candidates.append(normalize_name(romanize_hangul(stem)))
+
+        for candidate in candidates:
+            city = self._exact.get(candidate)
+            if city is not None:
+                return city
+
+        # 낱자모가 섞인 입력은 실제 도시명일 수 없으므로 가장 가까운 한글 별칭으로 보정
+        # (가장 가까운 도시가 둘 이상이면 판단하지 않음)
+        if has_loose_jamo(query):
+            best = {}
+            best_distance = None
+            for distance, label, city in self._near_matches(key):
+                if not is_hangul(label):
+                    continue
+                if best_distance is None:
+                    best_distance = distance
+                if distance == best_distance:
+                    best[city["id"]] = city
+            if len(best) == 1:
+                return next(iter(best.values()))
+        return None
+
+
+_index = {"key": None, "index": None}
+_index_lock = threading.Lock()
+
+
+def get_city_name_index(aliases=None):
+    """번들 도시 목록으로 만든 인덱스를 반환합니다 (같은 별칭이면 프로세스에서 재사용)"""
+    key = tuple(sorted((aliases or {}).items()))
+
+    with _index_lock:
+        if _index["index"] is None or _index["key"] != key:
+            _index["index"] = CityNameIndex(load_city_list(), aliases)
+            _index["key"] = key
+        return _index["index"]
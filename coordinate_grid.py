@@ -0,0 +1,63 @@
+"""
+좌표 격자화 (geohash)
+
+'내 위치 날씨'나 좌표 직접 입력은 매번 조금씩 다른 실수 좌표를 만들어서 캐시를 재사용할 수 없습니다.
+좌표를 geohash 칸의 중심으로 맞춰 같은 칸 안의 조회가 같은 요청(같은 캐시 키)이 되도록 합니다.
+OpenWeather 현재 날씨/예보는 수 km 단위로 같은 값을 주므로 기본 정밀도 5(약 4.9km x 4.9km)를 사용합니다.
+"""
+import os
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# 0이면 격자화하지 않고 좌표를 그대로 사용
+COORDINATE_GEOHASH_PRECISION = int(os.getenv("COORDINATE_GEOHASH_PRECISION", "5"))
+
+
+def _bisect_cell(lat, lon, precision):
+    """geohash 문자열과 그 칸의 (위도 범위, 경도 범위)를 함께 계산합니다"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # 경도부터 번갈아 가며 절반씩 나눔
+
+    while len(chars) < precision:
+        value_range, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            value_range[0] = mid
+        else:
+            bits = bits * 2
+            value_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars), lat_range, lon_range
+
+
+def encode_geohash(lat, lon, precision=COORDINATE_GEOHASH_PRECISION):
+    """좌표의 geohash 문자열"""
+    geohash, _, _ = _bisect_cell(lat, lon, precision)
+    return geohash
+
+
+def quantize_coordinates(lat, lon, precision=COORDINATE_GEOHASH_PRECISION):
+    """
+    좌표를 geohash 칸의 중심 좌표로 맞춥니다 (소수 넷째 자리까지 반올림).
+    precision이 0 이하이면 좌표를 그대로 반환합니다.
+    """
+    if precision <= 0:
+        return lat, lon
+
+    _, lat_range, lon_range = _bisect_cell(lat, lon, precision)
+    return (
+        round((lat_range[0] + lat_range[1]) / 2, 4),
+        round((lon_range[0] + lon_range[1]) / 2, 4),
+    )
@@ -0,0 +1,245 @@
+"""
+날씨 일기 분석
+
+일기 저장소의 기록(과 예전 텍스트 일기)을 한 번씩만 읽어 누적 집계표에 더하고,
+날씨/온도대별 기분 분포, 연속 기록(streak), 월별 요약을 계산합니다.
+집계표는 (날씨, 기분)·(온도대, 기분) 횟수, 월별 횟수/온도 합계, 일기를 쓴 날짜별 횟수만 담으므로
+새 일기는 자기 칸만 더하면 되고, 바뀐 텍스트 일기는 예전 기록을 빼고 새 기록을 더합니다.
+읽은 위치(마지막 기록 ID, 텍스트 파일의 크기/수정 시각)를 기억해 두므로
+다음 방문 때는 새로 추가된 일기만 읽습니다.
+"""
+import bisect
+import re
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import pandas as pd
+
+# 지도 범례와 같은 온도 구간
+TEMPERATURE_BANDS = [-float("inf"), 0, 10, 20, 25, 30, float("inf")]
+TEMPERATURE_BAND_NAMES = ["0°C 미만", "0-10°C", "10-20°C", "20-25°C", "25-30°C", "30°C 이상"]
+
+# 날씨 정보 없이 쓴 일기 (날씨/온도 분석에서는 제외)
+NO_WEATHER_DESCRIPTION = "날씨정보없음"
+
+LEGACY_ENTRY_PATTERN = re.compile(
+    r"=== 날씨 일기 \| (\d{4})년 (\d{2})월 (\d{2})일 (\d{2}):(\d{2}) ===\n"
+    r"도시: (.*)\n온도: (.*)°C\n날씨: (.*)\n습도: (.*)%\n기분: (.*)\n"
+)
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_legacy_diary(text):
+    """예전 텍스트 일기 파일 내용에서 일기 기록들을 추출합니다"""
+    records = []
+    for match in LEGACY_ENTRY_PATTERN.finditer(text):
+        year, month, day, hour, minute, city, temp, description, humidity, mood = match.groups()
+        records.append({
+            "date": f"{year}-{month}-{day}",
+            "created_at": f"{year}-{month}-{day} {hour}:{minute}:00",
+            "city": city,
+            "temp": _to_number(temp),
+            "description": description,
+            "humidity": _to_number(humidity),
+            "mood": mood,
+        })
+    return records
+
+
+def temperature_band(temp):
+    """온도가 속한 구간 이름 (온도가 없으면 None)"""
+    temp = _to_number(temp)
+    if temp is None or temp != temp:
+        return None
+    return TEMPERATURE_BAND_NAMES[bisect.bisect_right(TEMPERATURE_BANDS, temp) - 1]
+
+
+def _bump(counter, key, amount):
+    counter[key] += amount
+    if counter[key] == 0:
+        del counter[key]
+
+
+def _most_common(counter):
+    return counter.most_common(1)[0][0] if counter else None
+
+
+def calculate_streaks(days, today=None):
+    """
+    일기를 쓴 날짜들(YYYY-MM-DD)로 (현재 연속 기록 일수, 최장 연속 기록 일수)를 계산합니다.
+    오늘이나 어제 쓴 일기까지 이어져야 현재 기록으로 셉니다.
+    """
+    if not days:
+        return 0, 0
+
+    longest = run = 1
+    ordered = sorted(date.fromisoformat(day) for day in days)
+    for previous, current in zip(ordered, ordered[1:]):
+        run = run + 1 if current - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+
+    today = today or date.today()
+    current = run if today - ordered[-1] <= timedelta(days=1) else 0
+    return current, longest
+
+
+class DiaryStats:
+    """일기 기록의 누적 집계표 (기록 하나를 더하거나 뺄 때 해당 칸만 갱신)"""
+
+    def __init__(self):
+        self.entries = 0
+        self.weather_mood = Counter()
+        self.band_mood = Counter()
+        self.day_counts = Counter()
+        # 월 -> {"entries", "days", "moods", "weather", "temp_sum", "temp_count"}
+        self.months = {}
+
+    def add(self, record, sign=1):
+        """기록 하나를 집계에 더합니다 (sign=-1이면 뺌)"""
+        month_key = record["date"][:7]
+        month = self.months.get(month_key)
+        if month is None:
+            month = {"entries": 0, "days": Counter(), "moods": Counter(), "weather": Counter(),
+                     "temp_sum": 0.0, "temp_count": 0}
+            self.months[month_key] = month
+
+        self.entries += sign
+        _bump(self.day_counts, record["date"], sign)
+        month["entries"] += sign
+        _bump(month["days"], record["date"], sign)
+        _bump(month["moods"], record["mood"], sign)
+
+        if record["description"] != NO_WEATHER_DESCRIPTION:
+            _bump(self.weather_mood, (record["description"], record["mood"]), sign)
+            _bump(month["weather"], record["description"], sign)
+            band = temperature_band(record["temp"])
+            if band is not None:
+                _bump(self.band_mood, (band, record["mood"]), sign)
+                month["temp_sum"] += sign * float(record["temp"])
+                month["temp_count"] += sign
+
+        if month["entries"] == 0:
+            del self.months[month_key]
+
+    def remove(self, record):
+        self.add(record, -1)
+
+    def mood_table(self, counts, key, order=None):
+        """(key, 기분) 횟수를 key별 기분 횟수 표로 만듭니다"""
+        if not counts:
+            return pd.DataFrame()
+        table = pd.Series(counts).unstack(fill_value=0)
+        table.index.name = key
+        table.columns.name = "mood"
+        table = table.sort_index(axis=1)
+        if order is not None:
+            return table.reindex([name for name in order if name in table.index])
+        return table.sort_index()
+
+    def monthly_summary(self):
+        """월별 일기 수, 기록한 날 수, 평균 온도, 가장 많은 기분/날씨 (최신 월부터)"""
+        if not self.months:
+            return pd.DataFrame()
+        rows = {
+            month_key: {
+                "entries": month["entries"],
+                "days": len(month["days"]),
+                "top_mood": _most_common(month["moods"]),
+                "avg_temp": month["temp_sum"] / month["temp_count"] if month["temp_count"] else None,
+                "top_weather": _most_common(month["weather"]),
+            }
+            for month_key, month in self.months.items()
+        }
+        summary = pd.DataFrame.from_dict(rows, orient="index").sort_index(ascending=False)
+        summary.index.name = "month"
+        return summary
+
+
+class DiaryAnalytics:
+    """일기 저장소 하나에 대한 누적 분석 (새 기록만 읽어서 갱신)"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._stats = DiaryStats()
+        # 텍스트 일기 경로 -> ((크기, 수정 시각), 기록들)
+        self._legacy_records = {}
+        self._results = None
+        self._results_day = None
+
+    def refresh(self, legacy_files=()):
+        """새로 저장된 기록과 바뀐 텍스트 일기만 집계에 반영합니다. 바뀐 것이 있으면 True"""
+        with self._lock:
+            changed = False
+            for record in self.store.iter_records(self._last_id):
+                self._last_id = record["id"]
+                self._stats.add(record)
+                changed = True
+
+            paths = set()
+            for diary in legacy_files:
+                paths.add(diary.path)
+                signature = (diary.size, diary.mtime)
+                cached = self._legacy_records.get(diary.path)
+                if cached is not None and cached[0] == signature:
+                    continue
+
+                # 바뀐 파일은 예전 기록을 빼고 새로 읽은 기록을 더함
+                for record in cached[1] if cached is not None else ():
+                    self._stats.remove(record)
+                records = parse_legacy_diary(diary.read())
+                for record in records:
+                    self._stats.add(record)
+                self._legacy_records[diary.path] = (signature, records)
+                changed = True
+
+            for path in set(self._legacy_records) - paths:
+                for record in self._legacy_records.pop(path)[1]:
+                    self._stats.remove(record)
+                changed = True
+
+            if changed:
+                self._results = None
+            return changed
+
+    def results(self):
+        """분석 결과 (마지막 갱신 이후 바뀐 것이 없고 날짜가 같으면 이전 결과 재사용)"""
+        today = date.today()
+        with self._lock:
+            if self._results is None or self._results_day != today:
+                stats = self._stats
+                current_streak, longest_streak = calculate_streaks(stats.day_counts, today)
+                self._results = {
+                    "entries": stats.entries,
+                    "current_streak": current_streak,
+                    "longest_streak": longest_streak,
+                    "mood_by_weather": stats.mood_table(stats.weather_mood, "description"),
+                    "mood_by_temperature": stats.mood_table(
+                        stats.band_mood, "temp_band", TEMPERATURE_BAND_NAMES
+                    ),
+                    "monthly": stats.monthly_summary(),
+                }
+                self._results_day = today
+            return self._results
+
+
+_analytics = {}
+_analytics_lock = threading.Lock()
+
+
+def get_diary_analytics(store):
+    """저장소별 분석 객체를 프로세스에 하나만 만들어 둡니다"""
+    with _analytics_lock:
+        analytics = _analytics.get(store.path)
+        if analytics is None:
+            analytics = DiaryAnalytics(store)
+            _analytics[store.path] = analytics
+    return analytics
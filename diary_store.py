@@ -0,0 +1,345 @@
+"""
+날씨 일기 저장소
+
+일기를 SQLite(weather_diary/diary.db)에 한 줄씩 구조화해서 저장합니다.
+날짜 목록은 인덱스만 읽는 메타데이터 조회이고, 일기를 볼 때는 선택한 날짜의 기록만 읽습니다.
+저장은 전용 쓰기 스레드 하나가 요청 큐를 받아 처리하고(WAL 모드, 트랜잭션 단위로 원자적),
+읽기는 연결 풀의 별도 연결을 사용하므로 화면 렌더링이 저장을 기다리지 않습니다.
+예전 버전이 남긴 weather_diary/diary_YYYY-MM-DD.txt 파일도 계속 읽을 수 있으며,
+이 파일들도 목록에는 파일 이름과 크기만 사용하고 내용은 선택했을 때만 읽습니다.
+
+일기 본문/도시/기분은 FTS5 전문 검색 색인(diary_fts)에도 들어갑니다.
+색인은 트리거로 저장할 때마다 함께 갱신되며, FTS5를 쓸 수 없는 SQLite에서는 LIKE 검색을 사용합니다.
+"""
+import mmap
+import os
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+DIARY_DIR = "weather_diary"
+DIARY_DB = os.getenv("WEATHER_DIARY_DB", os.path.join(DIARY_DIR, "diary.db"))
+
+# 예전 텍스트 일기 파일 이름 (diary_YYYY-MM-DD.txt)
+LEGACY_DIARY_PATTERN = re.compile(r"^diary_(\d{4}-\d{2}-\d{2})\.txt$")
+# 이 크기(바이트) 이상인 텍스트 일기는 mmap으로 읽음
+LEGACY_MMAP_MIN_SIZE = int(os.getenv("WEATHER_DIARY_MMAP_MIN_SIZE", str(64 * 1024)))
+
+# 다른 연결(다른 프로세스)이 쓰는 중일 때 기다리는 최대 시간 (밀리초)
+DIARY_BUSY_TIMEOUT_MS = int(os.getenv("WEATHER_DIARY_BUSY_TIMEOUT_MS", "5000"))
+# 저장 요청이 한꺼번에 몰리면 최대 이만큼을 한 트랜잭션(한 번의 fsync)으로 묶어 저장
+DIARY_WRITE_BATCH_SIZE = int(os.getenv("WEATHER_DIARY_WRITE_BATCH_SIZE", "64"))
+# FULL: 커밋마다 fsync / NORMAL: WAL 체크포인트 때 모아서 fsync (전원 장애 시 마지막 몇 건을 잃을 수 있음)
+DIARY_SYNCHRONOUS = os.getenv("WEATHER_DIARY_SYNCHRONOUS", "FULL").upper()
+if DIARY_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    DIARY_SYNCHRONOUS = "FULL"
+# 저장 완료를 기다리는 최대 시간 (초)
+DIARY_WRITE_TIMEOUT = 30
+
+
+class LegacyDiaryFile:
+    """예전 텍스트 일기 파일 하나 (목록에는 파일 이름과 stat 정보만 쓰고, 내용은 read()할 때 읽음)"""
+
+    def __init__(self, date, path, size, mtime):
+        self.date = date
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    def read(self):
+        """파일 내용을 읽습니다. 큰 파일은 mmap으로 읽고, 읽지 못하면 빈 문자열"""
+        try:
+            with open(self.path, "rb") as f:
+                if self.size >= LEGACY_MMAP_MIN_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return mapped[:].decode("utf-8")
+                return f.read().decode("utf-8")
+        except (OSError, ValueError):
+            return ""
+
+
+def list_legacy_diaries(diary_dir=DIARY_DIR):
+    """예전 텍스트 일기 파일 목록 (최신 순). 파일 내용은 읽지 않습니다"""
+    try:
+        entries = list(os.scandir(diary_dir))
+    except OSError:
+        return []
+
+    diaries = []
+    for entry in entries:
+        match = LEGACY_DIARY_PATTERN.match(entry.name)
+        if not match or not entry.is_file():
+            continue
+        stat = entry.stat()
+        diaries.append(LegacyDiaryFile(match.group(1), entry.path, stat.st_size, stat.st_mtime))
+
+    diaries.sort(key=lambda diary: diary.date, reverse=True)
+    return diaries
+
+
+def format_diary_entry(entry):
+    """저장된 일기 기록을 예전 텍스트 파일과 같은 모양으로 만듭니다"""
+    created_at = datetime.strptime(entry['created_at'], "%Y-%m-%d %H:%M:%S")
+    return f"""
+=== 날씨 일기 | {created_at.strftime("%Y년 %m월 %d일 %H:%M")} ===
+도시: {entry['city']}
+온도: {entry['temp']}°C
+날씨: {entry['description']}
+습도: {entry['humidity']}%
+기분: {entry['mood']}
+
+오늘의 일기:
+{entry['text']}
+
+{'='*50}
+
+"""
+
+
+class DiaryStore:
+    """날씨 일기 기록 (도시, 온도, 날씨, 습도, 기분, 본문)을 저장하는 SQLite 저장소"""
+
+    def __init__(self, path=DIARY_DB):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 쓰기 연결은 쓰기 스레드만 사용 (스키마 생성 후 넘겨줌)
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        with self._writer:
+            self._writer.execute(
+                "CREATE TABLE IF NOT EXISTS diary_entries ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " date TEXT NOT NULL,"
+                " created_at TEXT NOT NULL,"
+                " city TEXT NOT NULL,"
+                " temp REAL,"
+                " description TEXT,"
+                " humidity INTEGER,"
+                " mood TEXT,"
+                " text TEXT NOT NULL)"
+            )
+            self._writer.execute("CREATE INDEX IF NOT EXISTS idx_diary_date ON diary_entries (date)")
+            self._writer.execute("CREATE INDEX IF NOT EXISTS idx_diary_city ON diary_entries (city, date)")
+            self.fts_enabled = self._create_search_index()
+
+        self._readers = queue.SimpleQueue()
+        self._write_queue = queue.SimpleQueue()
+        threading.Thread(target=self._write_loop, name="diary-writer", daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=DIARY_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={DIARY_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA synchronous={DIARY_SYNCHRONOUS}")
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        """읽기 연결을 풀에서 빌려줍니다 (없으면 새로 열고, 다 쓰면 풀에 반납)"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _create_search_index(self):
+        """전문 검색 색인과 동기화 트리거를 만듭니다. FTS5가 없으면 False"""
+        exists = self._writer.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'diary_fts'"
+        ).fetchone() is not None
+        try:
+            self._writer.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS diary_fts USING fts5("
+                " text, city, mood, content='diary_entries', content_rowid='id')"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, diary search falls back to LIKE: {e}")
+            return False
+
+        self._writer.execute(
+            "CREATE TRIGGER IF NOT EXISTS diary_fts_insert AFTER INSERT ON diary_entries BEGIN"
+            " INSERT INTO diary_fts (rowid, text, city, mood) VALUES (new.id, new.text, new.city, new.mood);"
+            " END"
+        )
+        self._writer.execute(
+            "CREATE TRIGGER IF NOT EXISTS diary_fts_delete AFTER DELETE ON diary_entries BEGIN"
+            " INSERT INTO diary_fts (diary_fts, rowid, text, city, mood)"
+            " VALUES ('delete', old.id, old.text, old.city, old.mood);"
+            " END"
+        )
+        self._writer.execute(
+            "CREATE TRIGGER IF NOT EXISTS diary_fts_update AFTER UPDATE ON diary_entries BEGIN"
+            " INSERT INTO diary_fts (diary_fts, rowid, text, city, mood)"
+            " VALUES ('delete', old.id, old.text, old.city, old.mood);"
+            " INSERT INTO diary_fts (rowid, text, city, mood) VALUES (new.id, new.text, new.city, new.mood);"
+            " END"
+        )
+        if not exists:
+            # 색인 이전에 저장된 기록이 있으면 한 번 채워 넣음
+            self._writer.execute("INSERT INTO diary_fts (diary_fts) VALUES ('rebuild')")
+        return True
+
+    def add_entry(self, city, temp, description, humidity, mood, text, created_at=None):
+        """일기 한 편을 쓰기 큐에 넣고 저장이 끝나면 기록 ID를 반환합니다"""
+        created_at = created_at or datetime.now()
+        values = (
+            created_at.strftime("%Y-%m-%d"),
+            created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            city,
+            temp,
+            description,
+            humidity,
+            mood,
+            text,
+        )
+        future = Future()
+        self._write_queue.put((values, future))
+        return future.result(timeout=DIARY_WRITE_TIMEOUT)
+
+    def _insert(self, values):
+        return self._writer.execute(
+            "INSERT INTO diary_entries"
+            " (date, created_at, city, temp, description, humidity, mood, text)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            values,
+        ).lastrowid
+
+    def _write_loop(self):
+        """쓰기 스레드: 큐에 쌓인 요청을 최대 DIARY_WRITE_BATCH_SIZE개씩 한 트랜잭션으로 저장"""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < DIARY_WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # 예상하지 못한 오류도 이 묶음의 요청만 실패시키고 쓰기 스레드는 계속 실행
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write_batch(self, batch):
+        """묶음을 저장하고, 커밋이 끝난 뒤에만 각 요청에 기록 ID를 돌려줍니다"""
+        try:
+            with self._writer:
+                ids = [self._insert(values) for values, _ in batch]
+        except Exception:
+            # 묶음 전체가 롤백되었으므로 한 건씩 다시 저장해 실패한 요청만 오류로 돌려줌
+            for values, future in batch:
+                try:
+                    with self._writer:
+                        row_id = self._insert(values)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(row_id)
+        else:
+            for (_, future), row_id in zip(batch, ids):
+                future.set_result(row_id)
+
+    def list_dates(self, city=None):
+        """일기가 있는 날짜 목록 (최신 순). city를 주면 그 도시의 일기만"""
+        query = "SELECT DISTINCT date FROM diary_entries"
+        params = ()
+        if city is not None:
+            query += " WHERE city = ?"
+            params = (city,)
+
+        with self._reader() as conn:
+            rows = conn.execute(query + " ORDER BY date DESC", params).fetchall()
+        return [row['date'] for row in rows]
+
+    def get_entries(self, date):
+        """해당 날짜의 일기 기록들 (작성 순)"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT * FROM diary_entries WHERE date = ? ORDER BY id", (date,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query, limit=50):
+        """
+        본문/도시/기분에 검색어가 모두 들어 있는 일기 기록 (최신 순, 최대 limit개).
+        검색어는 공백으로 나누며, 각 단어는 접두어로 찾습니다 ('비' -> '비가', '비오는').
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        if self.fts_enabled:
+            match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+            sql = (
+                "SELECT e.* FROM diary_fts JOIN diary_entries e ON e.id = diary_fts.rowid"
+                " WHERE diary_fts MATCH ? ORDER BY e.created_at DESC, e.id DESC LIMIT ?"
+            )
+            params = (match, limit)
+        else:
+            conditions = []
+            params = []
+            for term in terms:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append(
+                    "(text LIKE ? ESCAPE '\\' OR city LIKE ? ESCAPE '\\' OR mood LIKE ? ESCAPE '\\')"
+                )
+                params.extend([pattern] * 3)
+            sql = (
+                "SELECT * FROM diary_entries WHERE " + " AND ".join(conditions)
+                + " ORDER BY created_at DESC, id DESC LIMIT ?"
+            )
+            params = tuple(params) + (limit,)
+
+        with self._reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_records(self, after_id=0, batch_size=500):
+        """
+        id가 after_id보다 큰 기록을 본문 없이 id 순으로 돌려줍니다 (분석용).
+        batch_size개씩 나누어 읽으므로 전체 기록을 한 번에 메모리에 올리지 않습니다.
+        """
+        while True:
+            with self._reader() as conn:
+                rows = conn.execute(
+                    "SELECT id, date, created_at, city, temp, description, humidity, mood"
+                    " FROM diary_entries WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+
+            for row in rows:
+                yield dict(row)
+            after_id = rows[-1]['id']
+
+    def count(self):
+        with self._reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM diary_entries").fetchone()[0]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_diary_store(path=DIARY_DB):
+    """경로별 저장소를 하나만 열어 두고 모든 세션이 함께 사용합니다"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = DiaryStore(path)
+            _stores[path] = store
+    return store
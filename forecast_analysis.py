@@ -0,0 +1,236 @@
+"""
+5일 예보 분석
+
+예보 응답의 'list'를 한 번만 순회해 열(column) 단위 DataFrame으로 만들고,
+날짜/시간대 인덱스를 미리 계산해 두어 일별/시간대별 집계를 group-by 한 번으로 처리합니다.
+여러 도시의 예보도 하나의 DataFrame으로 쌓아 도시별 요약을 한 번에 계산할 수 있습니다.
+
+파싱한 예보와 그 요약은 (도시, 조회 시각)별로 프로세스 공용 캐시에 보관하므로
+Streamlit이 다시 실행될 때는 DataFrame을 만들거나 group-by를 다시 하지 않습니다.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from weather_cache import FETCHED_AT_KEY, FORECAST_CACHE_HARD_TTL, TTLCache
+
+# 하루를 6시간씩 4개 시간대로 나눔 (인덱스 0~3)
+PERIOD_NAMES = ["새벽", "오전", "오후", "저녁"]
+PERIOD_HOURS = 6
+
+UNKNOWN_WEATHER = "알 수 없음"
+
+FORECAST_FRAME_CACHE_SIZE = int(os.getenv("FORECAST_FRAME_CACHE_SIZE", "32"))
+
+forecast_frame_cache = TTLCache(max_entries=FORECAST_FRAME_CACHE_SIZE)
+
+
+def _local_timezone():
+    return datetime.now().astimezone().tzinfo
+
+
+def parse_forecast_items(items, cities=None):
+    """
+    예보 항목 리스트를 열 단위 DataFrame으로 변환합니다 (항목당 한 번만 접근).
+    cities를 주면 항목별 도시명을 'city' 열로 추가합니다.
+    """
+    weather = [item['weather'][0] for item in items]
+
+    frame = pd.DataFrame({
+        'dt': [item['dt'] for item in items],
+        'temp': [item['main']['temp'] for item in items],
+        'temp_min': [item['main'].get('temp_min', item['main']['temp']) for item in items],
+        'temp_max': [item['main'].get('temp_max', item['main']['temp']) for item in items],
+        'humidity': [item['main']['humidity'] for item in items],
+        'wind': [item['wind']['speed'] for item in items],
+        # description 또는 desc 키를 처리 (데모 데이터 호환)
+        'desc': [w.get('description', w.get('desc', UNKNOWN_WEATHER)) for w in weather],
+        'icon': [w['icon'] for w in weather],
+    })
+    if cities is not None:
+        frame['city'] = cities
+
+    # datetime.fromtimestamp와 같은 로컬 시간 기준
+    local_time = (
+        pd.to_datetime(frame['dt'], unit='s', utc=True)
+        .dt.tz_convert(_local_timezone())
+        .dt.tz_localize(None)
+    )
+    frame['time'] = local_time
+    frame['date'] = local_time.dt.strftime('%Y-%m-%d')
+    frame['period'] = local_time.dt.hour // PERIOD_HOURS
+    # 같은 빈도일 때 먼저 나온 날씨를 고르기 위한 순서
+    frame['position'] = range(len(frame))
+    return frame
+
+
+def lttb_indices(x, y, threshold):
+    """
+    LTTB(Largest-Triangle-Three-Buckets) 다운샘플링으로 남길 점의 인덱스를 반환합니다.
+    모양(최고/최저점)을 유지하면서 점 개수를 threshold개로 줄입니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 처음/마지막 점을 제외한 나머지를 threshold - 2개의 구간으로 나눔
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    previous = 0
+
+    for i in range(threshold - 2):
+        # 다음 구간의 평균점
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # 현재 구간에서 (이전 선택점, 다음 구간 평균점)과 만드는 삼각형이 가장 큰 점 선택
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected.append(previous)
+
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def most_common_weather(frame, keys):
+    """
+    그룹별로 가장 빈번한 날씨와 그 날씨의 첫 아이콘을 구합니다.
+    빈도가 같으면 먼저 나온 날씨를 선택합니다.
+    """
+    counts = (
+        frame.groupby(keys + ['desc'], sort=False)
+        .agg(count=('desc', 'size'), first_position=('position', 'min'), icon=('icon', 'first'))
+        .reset_index()
+        .sort_values(['count', 'first_position'], ascending=[False, True])
+        .drop_duplicates(keys)
+    )
+    return counts.set_index(keys)[['desc', 'icon']].rename(columns={'desc': 'weather'})
+
+
+def summarize_daily(frame, keys=()):
+    """(keys..., 날짜)별 최저/최고 온도, 대표 날씨/아이콘, 평균 습도/풍속"""
+    keys = list(keys) + ['date']
+    daily = frame.groupby(keys).agg(
+        min_temp=('temp', 'min'),
+        max_temp=('temp', 'max'),
+        avg_humidity=('humidity', 'mean'),
+        avg_wind=('wind', 'mean'),
+    )
+    daily['avg_humidity'] = daily['avg_humidity'].astype(int)
+    return daily.join(most_common_weather(frame, keys))
+
+
+def summarize_periods(frame, keys=()):
+    """(keys..., 날짜, 시간대)별 평균 온도와 대표 날씨"""
+    keys = list(keys) + ['date', 'period']
+    periods = frame.groupby(keys).agg(avg_temp=('temp', 'mean'))
+    periods = periods.join(most_common_weather(frame, keys))
+    periods['period_name'] = [PERIOD_NAMES[period] for period in periods.index.get_level_values('period')]
+    return periods
+
+
+def stack_forecasts(forecasts_by_city):
+    """{도시: 예보 응답}을 'city' 열이 붙은 하나의 DataFrame으로 쌓습니다 (비어 있는 응답은 제외)"""
+    items = []
+    cities = []
+    for city, forecast_data in forecasts_by_city.items():
+        if not forecast_data or 'list' not in forecast_data:
+            continue
+        items.extend(forecast_data['list'])
+        cities.extend([city] * len(forecast_data['list']))
+
+    return parse_forecast_items(items, cities)
+
+
+def summarize_forecasts(forecasts_by_city):
+    """
+    여러 도시의 예보를 한 번에 요약합니다.
+    반환값: (도시·날짜별 요약, 도시·날짜·시간대별 요약) DataFrame
+    """
+    frame = stack_forecasts(forecasts_by_city)
+    if frame.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    return summarize_daily(frame, ['city']), summarize_periods(frame, ['city'])
+
+
+def get_forecast_version(forecast_data):
+    """
+    예보 응답의 버전을 반환합니다.
+    API 응답은 조회 시각, 조회 시각이 없는 데모 데이터는 내용의 지문을 사용합니다.
+    """
+    fetched_at = forecast_data.get(FETCHED_AT_KEY)
+    if fetched_at is not None:
+        return fetched_at
+
+    return hash(tuple(
+        (item['dt'], item['main']['temp'], item['main']['humidity'])
+        for item in forecast_data['list']
+    ))
+
+
+class ForecastFrame:
+    """5일 예보 응답 하나를 파싱해 둔 열 단위 예보 (요약은 처음 요청할 때 한 번만 계산)"""
+
+    def __init__(self, forecast_data):
+        self.city_name = forecast_data['city']['name']
+        self.country = forecast_data['city']['country']
+        self.frame = parse_forecast_items(forecast_data['list'])
+        self._daily = None
+        self._periods = None
+        self._day_cards = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def daily_summary(self):
+        """날짜별 요약 (날짜순 정렬)"""
+        if self._daily is None:
+            self._daily = summarize_daily(self.frame)
+        return self._daily
+
+    def period_summary(self):
+        """(날짜, 시간대)별 요약"""
+        if self._periods is None:
+            self._periods = summarize_periods(self.frame)
+        return self._periods
+
+    def day_cards(self):
+        """
+        화면 표시용 날짜별 요약 목록 (날짜순). 각 항목은 일별 요약 값과
+        'periods': {시간대 인덱스: (평균 온도, 대표 날씨)}를 담은 dict입니다.
+        """
+        if self._day_cards is None:
+            periods = {}
+            for (date, period), avg_temp, weather in zip(
+                self.period_summary().index,
+                self.period_summary()['avg_temp'],
+                self.period_summary()['weather'],
+            ):
+                periods.setdefault(date, {})[period] = (avg_temp, weather)
+
+            self._day_cards = [
+                dict(day, date=date, periods=periods.get(date, {}))
+                for date, day in zip(self.daily_summary().index, self.daily_summary().to_dict('records'))
+            ]
+        return self._day_cards
+
+
+def get_forecast_frame(forecast_data):
+    """예보 응답의 ForecastFrame을 반환합니다. 같은 (도시, 버전)은 캐시에서 재사용합니다"""
+    key = (forecast_data['city']['name'], get_forecast_version(forecast_data))
+    forecast = forecast_frame_cache.get(key)
+    if forecast is None:
+        forecast = ForecastFrame(forecast_data)
+        forecast_frame_cache.set(key, forecast, FORECAST_CACHE_HARD_TTL)
+    return forecast
@@ -0,0 +1,114 @@
+"""
+5일 예보 차트
+
+예보의 모든 3시간 간격 데이터를 그대로 그리고, 점이 많은 긴 예보는 LTTB로 줄여서 그립니다.
+같은 조회 결과(도시, 조회 시각)의 차트는 프로세스 공용 캐시에서 재사용하므로
+Streamlit이 다시 실행될 때마다 Figure를 새로 만들지 않습니다.
+(Figure를 JSON으로 바꾸는 단계는 st.plotly_chart가 표시할 때마다 직접 수행하므로 여기서 캐시하지 않습니다)
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from forecast_analysis import get_forecast_frame, get_forecast_version, lttb_indices
+from weather_cache import FORECAST_CACHE_HARD_TTL, TTLCache
+
+# 이 개수를 넘는 예보는 다운샘플링 (기본 5일 예보 40개는 그대로 표시)
+FORECAST_CHART_MAX_POINTS = int(os.getenv("FORECAST_CHART_MAX_POINTS", "120"))
+FORECAST_CHART_CACHE_SIZE = int(os.getenv("FORECAST_CHART_CACHE_SIZE", "32"))
+
+forecast_chart_cache = TTLCache(max_entries=FORECAST_CHART_CACHE_SIZE)
+
+
+def build_forecast_chart(frame, show_range=True, max_points=FORECAST_CHART_MAX_POINTS):
+    """
+    열 단위 예보(forecast_analysis.parse_forecast_items)로 온도/습도 차트를 만듭니다.
+    show_range가 켜져 있으면 예보 항목별 최저~최고 온도 범위를 띠로 표시합니다.
+    """
+    # 온도 곡선의 모양을 기준으로 남길 점을 고르고, 습도/범위도 같은 시각만 사용
+    indices = lttb_indices(frame['dt'].to_numpy(), frame['temp'].to_numpy(), max_points)
+    times = frame['time'].to_numpy()[indices]
+    temps = frame['temp'].to_numpy()[indices]
+    humidity = frame['humidity'].to_numpy()[indices]
+
+    fig = go.Figure()
+
+    # 최저~최고 온도 범위 (두 번째 선까지 채워서 띠로 표시)
+    if show_range:
+        temp_min = frame['temp_min'].to_numpy()[indices]
+        temp_max = frame['temp_max'].to_numpy()[indices]
+        if not np.array_equal(temp_min, temp_max):
+            fig.add_trace(go.Scatter(
+                x=times,
+                y=temp_max,
+                mode='lines',
+                line=dict(width=0),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=times,
+                y=temp_min,
+                mode='lines',
+                name='최저~최고 (°C)',
+                line=dict(width=0),
+                fill='tonexty',
+                fillcolor='rgba(255,107,107,0.2)',
+                hoverinfo='skip'
+            ))
+
+    # 온도 라인
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=temps,
+        mode='lines+markers',
+        name='온도 (°C)',
+        line=dict(color='#FF6B6B', width=3),
+        marker=dict(size=5)
+    ))
+
+    # 습도 라인 (보조축)
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=humidity,
+        mode='lines+markers',
+        name='습도 (%)',
+        line=dict(color='#4ECDC4', width=3),
+        marker=dict(size=5),
+        yaxis='y2'
+    ))
+
+    # 레이아웃 설정
+    fig.update_layout(
+        title='📊 5일 날씨 트렌드',
+        xaxis_title='날짜',
+        xaxis=dict(tickformat='%m/%d'),
+        yaxis_title='온도 (°C)',
+        yaxis2=dict(
+            title='습도 (%)',
+            overlaying='y',
+            side='right'
+        ),
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+
+    return fig
+
+
+def get_forecast_chart(forecast_data, show_range=True):
+    """
+    예보 응답의 차트를 반환합니다. 같은 (도시, 버전)의 차트는 캐시에서 재사용하며,
+    캐시에 없을 때만 예보를 파싱합니다 (파싱 결과도 forecast_analysis 캐시에서 공유).
+    """
+    key = (forecast_data['city']['name'], get_forecast_version(forecast_data), show_range)
+    fig = forecast_chart_cache.get(key)
+    if fig is not None:
+        return fig
+
+    fig = build_forecast_chart(get_forecast_frame(forecast_data).frame, show_range)
+    forecast_chart_cache.set(key, fig, FORECAST_CACHE_HARD_TTL)
+    return fig
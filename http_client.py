@@ -0,0 +1,87 @@
+"""
+공용 HTTP 세션
+
+OpenWeather와 ip-api 호출이 모두 같은 연결 풀(keep-alive), 타임아웃, 재시도 정책을 사용합니다.
+매 요청마다 TCP/TLS 연결을 새로 맺지 않고, 멈춘 소켓이 스크립트 스레드를 붙잡지 않도록 합니다.
+"""
+import os
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+# Retry-After가 너무 길면 화면이 멈추므로 최대 대기 시간을 제한
+HTTP_RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "5"))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+class JitteredRetry(Retry):
+    """지수 백오프에 지터를 더하고, Retry-After 헤더는 최대 대기 시간 안에서 따릅니다"""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        # 여러 스레드가 동시에 재시도하지 않도록 0 ~ backoff 사이로 분산
+        return random.uniform(0, backoff)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, HTTP_RETRY_AFTER_MAX)
+
+
+def create_session():
+    """연결 풀과 재시도 정책이 설정된 세션을 만듭니다"""
+    retry = JitteredRetry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        # 재시도가 끝나면 예외 대신 마지막 응답(429 등)을 그대로 돌려줌
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 공용 세션을 반환합니다 (처음 호출할 때 생성)"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def http_get(url, params=None, timeout=None):
+    """공용 세션으로 GET 요청을 보냅니다. timeout을 생략하면 (연결, 읽기) 기본값을 사용합니다"""
+    return get_session().get(url, params=params, timeout=timeout or DEFAULT_TIMEOUT)
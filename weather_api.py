@@ -0,0 +1,200 @@
+"""
+OpenWeather 조회 계층
+
+캐시를 먼저 확인하고, 없을 때만 실제 API를 호출합니다.
+화면 메시지(st.info, st.warning 등)는 호출하는 쪽(app.py, app_new.py)에서 처리합니다.
+
+run_concurrently는 독립적인 조회들을 공용 스레드 풀에서 동시에 실행합니다.
+(HTTP 호출 자체는 requests 세션을 사용하는 블로킹 I/O이며, 동시성은 작업 스레드로 얻습니다)
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_health import get_open_circuit, record_status_code
+from http_client import http_get
+from weather_cache import (
+    CACHE_HARD_TTLS,
+    CACHE_TTLS,
+    FETCHED_AT_KEY,
+    NEGATIVE_CACHE_TTL,
+    STALE_WHILE_REVALIDATE,
+    get_data_age,
+    get_endpoint_name,
+    inflight_requests,
+    make_cache_key,
+    mark_stale,
+    negative_cache,
+    persistent_cache,
+    weather_cache,
+)
+
+# 동시 조회에 사용하는 최대 요청 수 (프로세스 전체 공용)
+BATCH_MAX_WORKERS = int(os.getenv("WEATHER_BATCH_MAX_WORKERS", "8"))
+_fetch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="weather-fetch")
+
+# 오래된 캐시가 있으면 새 응답 대신 그 데이터를 보여주는 일시적 오류 코드
+UPSTREAM_ERROR_CODES = (429, 500, 502, 503, 504)
+
+
+def get_cache_ttl(url):
+    return CACHE_TTLS.get(get_endpoint_name(url), CACHE_TTLS["weather"])
+
+
+def get_cache_hard_ttl(url):
+    return CACHE_HARD_TTLS.get(get_endpoint_name(url), CACHE_HARD_TTLS["weather"])
+
+
+def get_retry_after(response):
+    """Retry-After 헤더(초)를 읽습니다. 없거나 숫자가 아니면 None"""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def fetch_json(url, params, timeout=None):
+    """
+    OpenWeather API 응답을 (status_code, data) 형태로 반환합니다.
+    200 응답만 캐시하며, 네트워크 오류는 requests 예외로 그대로 전달됩니다.
+    같은 키로 동시에 들어온 요청은 하나의 API 호출 결과를 함께 사용합니다.
+
+    갱신 주기가 지난 캐시가 있으면 그 데이터를 STALE_KEY 표시와 함께 바로 반환하고
+    백그라운드에서 갱신합니다 (stale-while-revalidate). 이 모드를 끈 경우에도
+    API 호출이 실패하면 오래된 캐시 데이터를 대신 반환합니다.
+
+    404 응답은 NEGATIVE_CACHE_TTL 동안 기억하고, 401/429 이후에는 잠시 호출을 멈추므로
+    그동안 같은 실패는 네트워크 없이 바로 반환됩니다.
+    """
+    key = make_cache_key(url, params)
+
+    cached, is_fresh = _lookup_cached(key, url)
+    if cached is not None and is_fresh:
+        return 200, cached
+
+    if cached is not None and STALE_WHILE_REVALIDATE:
+        schedule_refresh(key, url, params, timeout)
+        return 200, mark_stale(cached)
+
+    # 최근에 404였던 요청이나 401/429로 회로가 열린 동안은 네트워크 없이 같은 결과로 응답
+    blocked_status = negative_cache.get(key) or get_open_circuit()
+    if blocked_status is not None:
+        if cached is not None:
+            return 200, mark_stale(cached)
+        return blocked_status, None
+
+    try:
+        status_code, data = inflight_requests.do(key, lambda: _request_and_cache(key, url, params, timeout))
+    except requests.exceptions.RequestException:
+        if cached is None:
+            raise
+        return 200, mark_stale(cached)
+
+    if status_code in UPSTREAM_ERROR_CODES and cached is not None:
+        return 200, mark_stale(cached)
+    return status_code, data
+
+
+def get_recent_json(url, params):
+    """
+    네트워크 호출 없이 캐시에 남아 있는 최근 응답을 반환합니다 (없으면 None).
+    API를 사용할 수 없을 때 데모 데이터보다 먼저 사용합니다.
+    """
+    cached, is_fresh = _lookup_cached(make_cache_key(url, params), url)
+    if cached is None or is_fresh:
+        return cached
+    return mark_stale(cached)
+
+
+def _lookup_cached(key, url):
+    """메모리 캐시, 다음으로 영구 캐시에서 (데이터, 최신 여부)를 찾습니다"""
+    cached, is_fresh = weather_cache.get_entry(key)
+    if cached is not None or persistent_cache is None:
+        return cached, is_fresh
+
+    stored = persistent_cache.get(key)
+    if stored is None:
+        return None, False
+
+    # 재시작 직후에는 영구 캐시의 데이터를 메모리 캐시로 올림
+    age = get_data_age(stored)
+    ttl = get_cache_ttl(url)
+    weather_cache.set(key, stored, ttl - age, get_cache_hard_ttl(url) - age)
+    return stored, age < ttl
+
+
+def schedule_refresh(key, url, params, timeout=None):
+    """이미 갱신 중이 아니라면 백그라운드에서 응답을 새로 가져옵니다"""
+    if inflight_requests.is_running(key):
+        return
+
+    _fetch_executor.submit(
+        inflight_requests.do, key, lambda: _request_and_cache(key, url, params, timeout, force=True)
+    )
+
+
+def _request_and_cache(key, url, params, timeout, force=False):
+    """실제 API를 호출하고 200 응답을 캐시에 저장합니다"""
+    # 기다리는 동안 다른 요청이 이미 캐시를 채웠을 수 있음
+    cached = None if force else weather_cache.get(key)
+    if cached is not None:
+        return 200, cached
+
+    open_circuit = get_open_circuit()
+    if open_circuit is not None:
+        return open_circuit, None
+
+    # 네트워크 오류는 이 요청만의 일시적 실패일 수 있으므로 API 상태는 바꾸지 않음 (상태 확인은 모니터가 담당)
+    response = http_get(url, params=params, timeout=timeout)
+
+    # 실제 조회 결과로 API 상태 모니터와 회로를 갱신
+    record_status_code(response.status_code, get_retry_after(response))
+    if response.status_code == 404:
+        negative_cache.set(key, 404, NEGATIVE_CACHE_TTL)
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    data[FETCHED_AT_KEY] = time.time()
+    weather_cache.set(key, data, get_cache_ttl(url), get_cache_hard_ttl(url))
+    if persistent_cache is not None:
+        persistent_cache.set(key, data)
+    return 200, data
+
+
+def run_concurrently(calls):
+    """
+    {이름: (함수, 인자...)} 형태의 독립적인 조회들을 동시에 실행하는 동기 진입점입니다.
+    전체 소요 시간은 각 조회 시간의 합이 아니라 가장 느린 조회 시간이 됩니다.
+    실패한 조회의 결과 자리에는 예외 객체가 들어갑니다.
+    주의: 함수는 작업 스레드에서 실행되므로 st.* 화면 호출을 포함하면 안 됩니다.
+    """
+    if not calls:
+        return {}
+
+    futures = {name: _fetch_executor.submit(*call) for name, call in calls.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = e
+    return results
+
+
+def fetch_json_batch(url, params_by_name):
+    """
+    여러 위치를 동시에 조회해 {이름: (status_code, data)}를 반환합니다.
+    캐시에 있는 위치는 바로 반환되고, 네트워크 오류가 난 위치는 (None, None)이 됩니다.
+    """
+    results = run_concurrently({
+        name: (fetch_json, url, params)
+        for name, params in params_by_name.items()
+    })
+
+    return {
+        name: (None, None) if isinstance(result, Exception) else result
+        for name, result in results.items()
+    }
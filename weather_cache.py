@@ -0,0 +1,243 @@
+"""
+OpenWeather 응답 캐시
+
+Streamlit은 rerun마다 app.py를 다시 실행하지만 import된 모듈은 프로세스에 남아 있으므로,
+이 모듈의 캐시는 모든 브라우저 세션이 함께 사용합니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# OpenWeather 현재 날씨는 약 10분 주기로 갱신되고, 5일 예보는 3시간 간격 데이터입니다
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", "1800"))
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "512"))
+
+# 갱신 주기가 지난 뒤에도 '오래된 데이터'로 보관하는 최대 시간 (stale-while-revalidate)
+WEATHER_CACHE_HARD_TTL = int(os.getenv("WEATHER_CACHE_HARD_TTL", "3600"))
+FORECAST_CACHE_HARD_TTL = int(os.getenv("FORECAST_CACHE_HARD_TTL", "10800"))
+STALE_WHILE_REVALIDATE = os.getenv("WEATHER_CACHE_STALE_WHILE_REVALIDATE", "1") != "0"
+
+# 엔드포인트별 캐시 유지 시간 (초)
+CACHE_TTLS = {
+    "weather": WEATHER_CACHE_TTL,
+    "forecast": FORECAST_CACHE_TTL,
+}
+CACHE_HARD_TTLS = {
+    "weather": WEATHER_CACHE_HARD_TTL,
+    "forecast": FORECAST_CACHE_HARD_TTL,
+}
+
+# 404(없는 도시) 응답을 기억하는 시간 (초) - 같은 입력으로 rerun할 때마다 다시 요청하지 않도록
+NEGATIVE_CACHE_TTL = int(os.getenv("WEATHER_NEGATIVE_CACHE_TTL", "300"))
+
+# 캐시에 저장하는 응답에 기록되는 조회 시각 (epoch 초)
+FETCHED_AT_KEY = "_fetched_at"
+# 갱신 주기가 지난 캐시 데이터를 반환할 때 붙는 표시
+STALE_KEY = "_stale"
+
+# 영구 캐시(SQLite) 파일 경로 - 비워두면 사용하지 않음
+WEATHER_CACHE_DB = os.getenv("WEATHER_CACHE_DB", "")
+# 재시작 직후 영구 캐시에서 바로 보여줄 수 있는 최대 데이터 나이 (초)
+PERSISTENT_CACHE_MAX_AGE = int(os.getenv("WEATHER_CACHE_DB_MAX_AGE", "10800"))
+
+
+class TTLCache:
+    """스레드 안전한 TTL + LRU 캐시"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key):
+        """
+        (값, 최신 여부)를 반환합니다.
+        갱신 주기 안이면 최신, 지났지만 보관 시간 안이면 오래된 값이고, 없으면 (None, False)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+
+            fresh_until, expires_at, value = entry
+            now = time.time()
+            if expires_at <= now:
+                del self._entries[key]
+                return None, False
+
+            self._entries.move_to_end(key)
+            return value, fresh_until > now
+
+    def get(self, key):
+        """갱신 주기 안의 값만 반환합니다. 없거나 오래되었으면 None"""
+        value, is_fresh = self.get_entry(key)
+        return value if is_fresh else None
+
+    def set(self, key, value, ttl, stale_ttl=None):
+        """
+        ttl 동안은 최신 값, stale_ttl(전체 보관 시간)까지는 오래된 값으로 보관합니다.
+        최대 개수를 넘으면 가장 오래 사용되지 않은 항목을 버립니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now + ttl, now + max(ttl, stale_ttl or ttl), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheStore:
+    """원본 JSON 응답과 조회 시각을 SQLite에 저장하는 영구 캐시 (앱 재시작/재배포 후에도 유지)"""
+
+    def __init__(self, path, max_age=PERSISTENT_CACHE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " fetched_at REAL NOT NULL,"
+                " body TEXT NOT NULL)"
+            )
+        self.prune()
+
+    def get(self, key):
+        """저장된 응답을 반환합니다. 없거나 최대 나이를 넘었으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None or time.time() - row[0] > self.max_age:
+            return None
+        return json.loads(row[1])
+
+    def set(self, key, data):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, fetched_at, body) VALUES (?, ?, ?)",
+                (key, data.get(FETCHED_AT_KEY, time.time()), json.dumps(data, ensure_ascii=False)),
+            )
+
+    def prune(self):
+        """최대 나이를 넘은 응답을 삭제합니다"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age,)
+            )
+
+
+class _InFlightCall:
+    """진행 중인 요청 하나의 결과를 기다리는 호출자들이 공유하는 상태"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키에 대한 동시 요청을 하나로 합칩니다.
+    먼저 들어온 호출만 실제로 실행하고, 나머지는 그 결과(또는 예외)를 함께 받습니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def is_running(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+def get_data_age(data):
+    """캐시된 응답이 조회된 지 몇 초 지났는지 반환합니다"""
+    return time.time() - data.get(FETCHED_AT_KEY, 0)
+
+
+def mark_stale(data):
+    """갱신 주기가 지난 데이터라는 표시를 붙인 사본을 반환합니다 (캐시 원본은 그대로 유지)"""
+    stale = dict(data)
+    stale[STALE_KEY] = True
+    return stale
+
+
+def get_endpoint_name(url):
+    """API URL에서 엔드포인트 이름(weather, forecast)을 추출합니다"""
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def make_cache_key(url, params):
+    """
+    엔드포인트와 정규화된 위치/단위/언어로 캐시 키를 만듭니다.
+    API 키(appid)는 응답 내용과 무관하므로 키에서 제외합니다.
+    """
+    parts = []
+    for name in sorted(params):
+        if name == "appid":
+            continue
+
+        value = params[name]
+        if name == "q":
+            # 대소문자/공백 차이는 같은 도시로 취급
+            value = " ".join(str(value).split()).lower()
+        elif name in ("lat", "lon"):
+            value = f"{float(value):.4f}"
+
+        parts.append(f"{name}={value}")
+
+    return f"{get_endpoint_name(url)}?{'&'.join(parts)}"
+
+
+# 프로세스 전역 캐시와 요청 합치기 (모든 세션 공유)
+weather_cache = TTLCache()
+negative_cache = TTLCache()
+inflight_requests = SingleFlight()
+persistent_cache = SQLiteCacheStore(WEATHER_CACHE_DB) if WEATHER_CACHE_DB else None
@@ -0,0 +1,288 @@
+"""
+전국 날씨 지도
+
+지도는 (중심 도시, 표시 내용) 버전마다 한 번만 새 folium 지도로 그려 HTML로 렌더링하고,
+그 HTML을 프로세스에 보관해 모든 세션과 rerun에서 그대로 재사용합니다.
+folium 지도 객체는 렌더링할 때마다 스크립트 요소가 누적되므로 공유하거나 다시 렌더링하지 않습니다.
+도시 마커는 도시마다 FeatureGroup 하나로 묶어 그립니다.
+
+도시 수가 많으면(MAP_BULK_THRESHOLD 초과) 도시마다 마커/팝업 코드를 만드는 대신
+모든 도시를 GeoJSON 레이어 하나로 그리고, 색상은 각 도시의 온도 속성으로 정합니다.
+WEATHER_MAP_CLUSTER=1이면 이 모드에서 가까운 도시들을 클러스터로 묶어 표시합니다.
+"""
+import os
+import threading
+
+import folium
+from folium.plugins import FastMarkerCluster
+
+KOREA_CENTER = (36.5, 127.5)
+KOREA_ZOOM = 7
+CITY_ZOOM = 10  # 도시 선택시 더 가까이
+
+# 이 수를 넘는 도시를 그릴 때는 GeoJSON 레이어 하나로 묶어서 표시
+MAP_BULK_THRESHOLD = int(os.getenv("MAP_BULK_THRESHOLD", "40"))
+MAP_CLUSTER = os.getenv("WEATHER_MAP_CLUSTER", "0") == "1"
+
+# 클러스터 모드에서 각 도시 행 [위도, 경도, 온도 색상, 툴팁, 선택 여부]를 원형 마커로 만드는 함수
+CLUSTER_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: row[4] ? 12 : 8,
+        color: row[4] ? '#FFD700' : 'white',
+        weight: row[4] ? 3 : 1,
+        fillColor: row[2],
+        fillOpacity: 0.8
+    });
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+LEGEND_HTML = '''
+    <div style="position: fixed;
+                bottom: 50px; left: 50px; width: 200px; height: 120px;
+                background-color: white; border:2px solid grey; z-index:9999;
+                font-size:14px; padding: 10px">
+    <h4>온도 범례</h4>
+    <p><span style="color:#0000FF;">●</span> 0°C 미만 (매우 추움)</p>
+    <p><span style="color:#4169E1;">●</span> 0-10°C (추움)</p>
+    <p><span style="color:#32CD32;">●</span> 10-20°C (선선함)</p>
+    <p><span style="color:#FFD700;">●</span> 20-25°C (적당함)</p>
+    <p><span style="color:#FF8C00;">●</span> 25-30°C (더움)</p>
+    <p><span style="color:#FF0000;">●</span> 30°C 이상 (매우 더움)</p>
+    </div>
+    '''
+
+
+def get_temperature_color(temp):
+    """온도에 따른 색상을 반환합니다"""
+    if temp < 0:
+        return '#0000FF'  # 파란색 (매우 추움)
+    elif temp < 10:
+        return '#4169E1'  # 로얄 블루 (추움)
+    elif temp < 20:
+        return '#32CD32'  # 라임 그린 (선선함)
+    elif temp < 25:
+        return '#FFD700'  # 골드 (적당함)
+    elif temp < 30:
+        return '#FF8C00'  # 다크 오렌지 (더움)
+    else:
+        return '#FF0000'  # 빨간색 (매우 더움)
+
+
+def get_weather_icon_emoji(icon_code):
+    """OpenWeather 아이콘 코드를 텍스트로 변환"""
+    icon_map = {
+        '01d': 'SUN', '01n': 'MOON',  # 맑음
+        '02d': 'PARTLY_CLOUDY', '02n': 'CLOUDY',  # 구름조금
+        '03d': 'CLOUDY', '03n': 'CLOUDY',  # 구름많음
+        '04d': 'CLOUDY', '04n': 'CLOUDY',  # 흐림
+        '09d': 'RAIN', '09n': 'RAIN',  # 소나기
+        '10d': 'RAIN', '10n': 'RAIN',  # 비
+        '11d': 'STORM', '11n': 'STORM',  # 천둥번개
+        '13d': 'SNOW', '13n': 'SNOW',  # 눈
+        '50d': 'FOG', '50n': 'FOG'   # 안개
+    }
+    return icon_map.get(icon_code, 'CLEAR')
+
+
+def get_marker_signature(weather_data, is_selected):
+    """마커에 표시되는 내용만 모은 값 (같으면 마커를 다시 만들 필요가 없음)"""
+    weather = weather_data['weather'][0]
+    return (
+        weather_data['main']['temp'],
+        weather.get('description', weather.get('desc', '')),
+        weather['icon'],
+        weather_data['main']['humidity'],
+        is_selected,
+    )
+
+
+def create_city_layer(city_name, coordinates, weather_data, is_selected):
+    """도시 하나의 원형 마커와 온도 텍스트를 FeatureGroup으로 묶어 만듭니다"""
+    temp, desc, icon, humidity, _ = get_marker_signature(weather_data, is_selected)
+
+    # 온도에 따른 색상
+    color = get_temperature_color(temp)
+
+    # 날씨 아이콘 이모지
+    weather_emoji = get_weather_icon_emoji(icon)
+
+    marker_radius = 20 if is_selected else 15
+    marker_weight = 4 if is_selected else 2
+
+    layer = folium.FeatureGroup(name=city_name, control=False)
+
+    # 마커 생성
+    folium.CircleMarker(
+        location=[coordinates["lat"], coordinates["lon"]],
+        radius=marker_radius,
+        popup=folium.Popup(f"""
+        <div style="width: 200px; text-align: center;">
+            <h4>{weather_emoji} {city_name}</h4>
+            <p><strong>{temp}°C</strong></p>
+            <p>{desc}</p>
+            <p>습도: {humidity}%</p>
+            {'<p><strong>선택된 도시</strong></p>' if is_selected else ''}
+        </div>
+        """, max_width=300),
+        tooltip=f"{city_name}: {temp}°C",
+        color='#FFD700' if is_selected else 'white',
+        fillColor=color,
+        fillOpacity=0.9 if is_selected else 0.8,
+        weight=marker_weight
+    ).add_to(layer)
+
+    # 온도 텍스트 오버레이
+    folium.Marker(
+        location=[coordinates["lat"], coordinates["lon"]],
+        icon=folium.DivIcon(
+            html=f'<div style="color: white; font-weight: bold; font-size: 12px; text-shadow: 1px 1px 1px black;">{temp}°C</div>',
+            icon_size=(50, 20),
+            icon_anchor=(25, 10)
+        )
+    ).add_to(layer)
+
+    return layer
+
+
+def create_bulk_layer(cities, cities_weather, center_city=None, cluster=MAP_CLUSTER):
+    """
+    모든 도시를 레이어 하나로 만듭니다.
+    기본은 온도 속성으로 색을 정하는 GeoJSON 레이어이고, cluster가 켜져 있으면
+    도시 행 배열 하나를 넘기는 FastMarkerCluster를 사용합니다.
+    """
+    features = []
+    for city_name, weather_data in cities_weather.items():
+        if city_name not in cities:
+            continue
+        temp, desc, _, humidity, _ = get_marker_signature(weather_data, False)
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [cities[city_name]["lon"], cities[city_name]["lat"]],
+            },
+            "properties": {
+                "name": city_name,
+                "temp": temp,
+                "desc": desc,
+                "humidity": humidity,
+                "selected": city_name == center_city,
+            },
+        })
+
+    if cluster:
+        rows = [
+            [
+                feature["geometry"]["coordinates"][1],
+                feature["geometry"]["coordinates"][0],
+                get_temperature_color(feature["properties"]["temp"]),
+                f"{feature['properties']['name']}: {feature['properties']['temp']}°C",
+                feature["properties"]["selected"],
+            ]
+            for feature in features
+        ]
+        return FastMarkerCluster(rows, callback=CLUSTER_MARKER_CALLBACK, control=False)
+
+    def style_function(feature):
+        properties = feature["properties"]
+        return {
+            "radius": 12 if properties["selected"] else 8,
+            "color": '#FFD700' if properties["selected"] else 'white',
+            "weight": 3 if properties["selected"] else 1,
+            "fillColor": get_temperature_color(properties["temp"]),
+            "fillOpacity": 0.8,
+        }
+
+    return folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        marker=folium.CircleMarker(),
+        style_function=style_function,
+        tooltip=folium.GeoJsonTooltip(fields=["name", "temp"], aliases=["도시", "온도(°C)"]),
+        popup=folium.GeoJsonPopup(
+            fields=["name", "temp", "desc", "humidity"],
+            aliases=["도시", "온도(°C)", "날씨", "습도(%)"],
+        ),
+        control=False,
+    )
+
+
+def build_korea_map(center_city, cities, cities_weather, signatures):
+    """새 folium 지도에 범례와 도시 마커(많으면 일괄 레이어)를 그립니다"""
+    if center_city in cities:
+        center = (cities[center_city]["lat"], cities[center_city]["lon"])
+        zoom = CITY_ZOOM
+    else:
+        center = KOREA_CENTER
+        zoom = KOREA_ZOOM
+
+    korea_map = folium.Map(location=list(center), zoom_start=zoom, tiles='OpenStreetMap')
+    korea_map.get_root().html.add_child(folium.Element(LEGEND_HTML))
+
+    if len(signatures) > MAP_BULK_THRESHOLD:
+        create_bulk_layer(cities, cities_weather, center_city).add_to(korea_map)
+    else:
+        for city_name in signatures:
+            create_city_layer(
+                city_name, cities[city_name], cities_weather[city_name], city_name == center_city
+            ).add_to(korea_map)
+    return korea_map
+
+
+class KoreaWeatherMap:
+    """중심 도시 하나에 대한 지도의 렌더링 결과 (표시 내용이 바뀔 때만 다시 그림)"""
+
+    def __init__(self, center_city):
+        self.center_city = center_city
+        self.lock = threading.Lock()
+        self.version = None
+        self.html = None
+
+    def update(self, cities, cities_weather):
+        """
+        날씨 데이터를 지도에 반영합니다. 표시 내용이 바뀌었으면 지도를 새로 그리고 True를 반환합니다.
+        """
+        signatures = {}
+        for city_name in cities:
+            weather_data = cities_weather.get(city_name)
+            if weather_data:
+                try:
+                    signatures[city_name] = get_marker_signature(weather_data, city_name == self.center_city)
+                except Exception as e:
+                    print(f"Error processing {city_name}: {e}")
+
+        version = tuple(signatures.items())
+        if version == self.version:
+            return False
+
+        # 같은 변경을 여러 세션이 동시에 그리지 않도록 잠금 안에서 다시 확인
+        with self.lock:
+            if version == self.version:
+                return False
+
+            korea_map = build_korea_map(self.center_city, cities, cities_weather, signatures)
+            self.html = korea_map.get_root().render()
+            self.version = version
+            return True
+
+
+# 중심 도시(없으면 None) -> KoreaWeatherMap
+_maps = {}
+_maps_lock = threading.Lock()
+
+
+def get_korea_weather_map(center_city, cities, cities_weather):
+    """(중심 도시, 날씨 데이터)에 맞는 지도를 반환합니다. 표시 내용이 같으면 렌더링한 HTML을 재사용합니다"""
+    if center_city not in cities:
+        center_city = None
+
+    with _maps_lock:
+        korea_map = _maps.get(center_city)
+        if korea_map is None:
+            korea_map = KoreaWeatherMap(center_city)
+            _maps[center_city] = korea_map
+
+    korea_map.update(cities, cities_weather)
+    return korea_map